@@ -1,14 +1,23 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+import sys
+from pathlib import Path
+
+REPO_ROOT = str(Path(__file__).resolve().parent.parent)
+if REPO_ROOT not in sys.path:  # the script reruns on every interaction
+    sys.path.insert(0, REPO_ROOT)
+from shared.export import download_button
+from shared.filters import FacetCounter, filter_index
+from shared.loader import dataset_version
+from shared.profiling import performance_panel, span, start_profiling
 
 # Page config
 st.set_page_config(page_title="Buy Side Committee Dashboard", layout="wide")
+start_profiling()
 
 
 # Load external CSS
-from pathlib import Path
-
 def load_css(filename):
     css_path = Path(__file__).parent / filename
     with open(css_path) as f:
@@ -19,35 +28,52 @@ load_css("style.css")
 # Top navbar
 st.markdown('<div class="navbar">📊 Strategic Buy Side Committee Dashboard</div>', unsafe_allow_html=True)
 
-# Load data
-from pathlib import Path
-excel_path = Path(__file__).parent / "BuySide.xlsx"
-df = pd.read_excel(excel_path)
+filter_fields = [
+    "Sector of Interest", "Geography Preference", "Investment Type",
+    "Deal Structure Preference", "Client Type", "Investment Horizon",
+    "ESG Mandate", "Board Representation Required", "Risk Appetite",
+    "Decision Making Speed"
+]
 
-df = df.dropna(how='all')
+# Load data together with its filter bitmaps (built once per data version)
+index = filter_index("buyside", filter_fields)
+df = index.frame.copy(deep=False)  # the index holds the shared cached frame
 
 # --- Sidebar Filters ---
 st.sidebar.header("🔍 Filters")
 
+def current_selection(field):
+    """Selection of ``field`` for this rerun, read before its widgets are drawn."""
+    if st.session_state.get(field, True):
+        return index.options[field]
+    return st.session_state.get(f"{field} options", index.options[field])
+
+# Facet counts need every filter's value before the first widget is drawn
+engagement_range = st.session_state.get("engagement", (1, 5))
+engagement = None
+if "Engagement Level (1 to 5)" in df.columns:
+    engagement = df["Engagement Level (1 to 5)"].between(*engagement_range).to_numpy()
+facets = st.session_state.setdefault("facets", FacetCounter()).counts(
+    index, {field: current_selection(field) for field in index.columns},
+    extra=engagement, extra_key=engagement_range,
+)
+
 def dropdown_filter(label, column):
-    unique_vals = sorted(df[column].dropna().unique())
+    unique_vals = index.options[column]
+    counts = facets[column]
     all_selected = st.sidebar.checkbox(f"Select all {label}", value=True, key=label)
-    return unique_vals if all_selected else st.sidebar.multiselect(label, unique_vals, default=unique_vals)
-
-filter_fields = [
-    "Sector of Interest", "Geography Preference", "Investment Type",
-    "Deal Structure Preference", "Client Type", "Investment Horizon",
-    "ESG Mandate", "Board Representation Required", "Risk Appetite",
-    "Decision Making Speed"
-]
+    return unique_vals if all_selected else st.sidebar.multiselect(
+        label, unique_vals, default=unique_vals, key=f"{label} options",
+        format_func=lambda value: f"{value} ({counts[value]})",
+    )
 
-for field in filter_fields:
-    if field in df.columns:
-        df = df[df[field].isin(dropdown_filter(field, field))]
+selections = {field: dropdown_filter(field, field) for field in index.columns}
 
 if "Engagement Level (1 to 5)" in df.columns:
-    min_eng, max_eng = st.sidebar.slider("Engagement Level (1 to 5)", 1, 5, (1, 5))
-    df = df[df["Engagement Level (1 to 5)"].between(min_eng, max_eng)]
+    st.sidebar.slider("Engagement Level (1 to 5)", 1, 5, (1, 5), key="engagement")
+
+df = index.select(selections, extra=engagement)
+view_state = (dataset_version("buyside"), selections, engagement_range)
 
 # --- Tabs ---
 tabs = st.tabs([
@@ -56,7 +82,7 @@ tabs = st.tabs([
 ])
 
 # --- Tab 0: Overview ---
-with tabs[0]:
+with tabs[0], span("tab overview"):
     st.subheader("📊 Summary Metrics")
     c1, c2, c3 = st.columns(3)
     c1.metric("Total Clients", len(df))
@@ -71,21 +97,21 @@ with tabs[0]:
             st.plotly_chart(px.pie(df, names=col, title=f"{col} Distribution"), use_container_width=True)
 
 # --- Tab 1: Sector Trends ---
-with tabs[1]:
+with tabs[1], span("tab sector trends"):
     st.subheader("📈 Sector vs Deal Structure")
-    chart = df.groupby(["Sector of Interest", "Deal Structure Preference"]).size().reset_index(name="Count")
+    chart = df.groupby(["Sector of Interest", "Deal Structure Preference"], observed=True).size().reset_index(name="Count")
     fig = px.bar(chart, x="Sector of Interest", y="Count", color="Deal Structure Preference", barmode="group")
     st.plotly_chart(fig, use_container_width=True)
 
 # --- Tab 2: Investment Types ---
-with tabs[2]:
+with tabs[2], span("tab investment types"):
     st.subheader("💼 Investment Type vs Horizon")
-    chart = df.groupby(["Investment Type", "Investment Horizon"]).size().reset_index(name="Count")
+    chart = df.groupby(["Investment Type", "Investment Horizon"], observed=True).size().reset_index(name="Count")
     fig = px.bar(chart, x="Investment Type", y="Count", color="Investment Horizon", barmode="stack")
     st.plotly_chart(fig, use_container_width=True)
 
 # --- Tab 3: Geography ---
-with tabs[3]:
+with tabs[3], span("tab geography"):
     st.subheader("📍 Geography Preference")
     chart = df["Geography Preference"].value_counts().reset_index()
     chart.columns = ["Geography", "Count"]
@@ -93,23 +119,26 @@ with tabs[3]:
     st.plotly_chart(fig, use_container_width=True)
 
 # --- Tab 4: Financial Preferences ---
-with tabs[4]:
+with tabs[4], span("tab financial preferences"):
     st.subheader("💰 Fund Size vs Deal Size")
-    df_numeric = df.copy()
-    df_numeric["Fund Size (INR Cr)"] = pd.to_numeric(df_numeric["Fund Size (INR Cr)"], errors='coerce')
-    df_numeric["Deal Size Range (INR Cr)"] = pd.to_numeric(df_numeric["Deal Size Range (INR Cr)"], errors='coerce')
+    # The converted column goes on a three-column projection, not a copy of the frame
+    df_numeric = df[["Fund Size (INR Cr)", "Sector of Interest"]].assign(**{
+        "Deal Size Range (INR Cr)": pd.to_numeric(df["Deal Size Range (INR Cr)"], errors='coerce')})
     fig = px.scatter(df_numeric, x="Fund Size (INR Cr)", y="Deal Size Range (INR Cr)", color="Sector of Interest")
     st.plotly_chart(fig, use_container_width=True)
 
 # --- Tab 5: Contacts ---
-with tabs[5]:
+with tabs[5], span("tab contacts"):
     st.subheader("📇 Contact List")
     contact_cols = ["Client Name", "Contact Person Name", "Designation", "Email ID", "Phone No"]
     st.dataframe(df[[col for col in contact_cols if col in df.columns]], use_container_width=True)
-    st.download_button("⬇️ Download Filtered Data", df.to_csv(index=False), file_name="Filtered_BuySide_Clients.csv")
+    download_button("⬇️ Download Filtered Data", df, "Filtered_BuySide_Clients", state=view_state)
 
 # --- Tab 6: Compare Segments ---
-with tabs[6]:
+# Fragment panel: its widgets rerun only this tab (see shared.tabs)
+@st.fragment
+@span("compare segments")
+def compare_segments(df):
     st.subheader("⚖️ Compare Segments")
     comp_field = st.selectbox("Select Comparison Field", ["Sector of Interest", "Investment Type", "Client Type"])
     unique_vals = df[comp_field].dropna().unique()
@@ -119,7 +148,6 @@ with tabs[6]:
 
     if seg1 != seg2:
         comp_df = df[df[comp_field].isin([seg1, seg2])]
-        comp_df["Fund Size (INR Cr)"] = pd.to_numeric(comp_df["Fund Size (INR Cr)"], errors='coerce')
 
         st.subheader("📊 Fund Size Comparison")
         st.plotly_chart(px.box(comp_df, x=comp_field, y="Fund Size (INR Cr)", color=comp_field), use_container_width=True)
@@ -130,3 +158,9 @@ with tabs[6]:
             "Client Name": "count"
         }).rename(columns={"Client Name": "Client Count"}).reset_index()
         st.dataframe(summary, use_container_width=True)
+
+with tabs[6], span("tab compare segments"):
+    compare_segments(df)
+
+# --- Performance (opt-in sidebar panel) ---
+performance_panel()
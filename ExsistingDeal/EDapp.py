@@ -1,11 +1,22 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from pathlib import Path
+import sys
+
+REPO_ROOT = str(Path(__file__).resolve().parent.parent)
+if REPO_ROOT not in sys.path:  # the script reruns on every interaction
+    sys.path.insert(0, REPO_ROOT)
+from shared.export import download_button
+from shared.filters import filter_index
+from shared.grid import paged_grid
+from shared.loader import dataset_version
+from shared.profiling import performance_panel, start_profiling
+from shared.tabs import lazy_tabs, tab_body
 
 # --- Page Config ---
 st.set_page_config(page_title="E-Deal Advanced Dashboard", layout="wide")
+start_profiling()
 
 # --- Load CSS ---
 def load_css(filename):
@@ -18,41 +29,37 @@ load_css("style.css")
 # --- Top Navbar ---
 st.markdown('<div class="navbar">💼 E-Deal Advanced Dashboard</div>', unsafe_allow_html=True)
 
-# --- Load Excel Data ---
-excel_path = Path(__file__).parent / "EDeal.xlsx"
-df = pd.read_excel(excel_path)
-df = df.dropna(how="all")
-
 # --- Sidebar Filters (Updated style from FinMod) ---
 st.sidebar.header("🔍 Filters")
 filters = ["ANALYST", "DEAL_PRIORITY", "STATUS", "COMPANY_SECTOR", "INVESTOR_TYPE", "DUE_DILIGENCE_STATUS", "DEAL_STAGE"]
-for field in filters:
-    if field in df.columns:
-        unique_vals = sorted(df[field].dropna().unique())
-        all_selected = st.sidebar.checkbox(f"Select all {field}", value=True, key=field)
-        selected_vals = unique_vals if all_selected else st.sidebar.multiselect(field, unique_vals, default=unique_vals)
-        df = df[df[field].isin(selected_vals)]
+# Loads the data with its filter bitmaps (built once per data version)
+index = filter_index("existing_deal", filters)
+selections = {}
+for field in index.columns:
+    unique_vals = index.options[field]
+    all_selected = st.sidebar.checkbox(f"Select all {field}", value=True, key=field)
+    selections[field] = unique_vals if all_selected else st.sidebar.multiselect(field, unique_vals, default=unique_vals)
+df = index.select(selections)
 
 # --- The rest of the dashboard code remains unchanged ---
 
-# Ensure proper formats
-if "DATE" in df.columns:
-    df["DATE"] = pd.to_datetime(df["DATE"], errors="coerce")
-if "Actual Value" in df.columns:
-    df["Actual Value"] = pd.to_numeric(df["Actual Value"], errors="coerce")
+# Column types (DATE, Actual Value, filter categories) are applied at load by shared.datasets
 
 # (Rest of the tabs and charts continue as they were before)
 # Tabs: Overview, Analyst, Sector, Trends, Match Score, Mandate & NDA, Strategic Fit, DD vs Investor, Raw Data
 
 # --- Tabs ---
-tabs = st.tabs([
+# Lazy tabs, replayed per view_state (see shared.tabs)
+view_state = (dataset_version("existing_deal"), selections)
+tabs = lazy_tabs([
     "📊 Overview", "🧩 Priority Breakdown", "👤 Analyst Performance", "🏢 Sector Analysis",
     "📈 Trends Over Time", "🧠 Match Score Analysis", "📂 Mandate & NDA",
     "🧾 Strategic Fit", "🔍 DD vs Investor", "📋 Full Data"
-])
+], key="tabs")
 
 # --- Tab 0: Overview ---
-with tabs[0]:
+@tab_body(tabs[0], state=view_state)
+def overview_tab():
     st.subheader("📊 Deal Summary")
     c1, c2, c3 = st.columns(3)
     c1.metric("Total Deals", len(df))
@@ -67,45 +74,51 @@ with tabs[0]:
         col2.plotly_chart(px.pie(df, names="DEAL_STAGE", title="Deal Stage"), use_container_width=True)
 
 # --- Tab 1: Priority Pie ---
-with tabs[1]:
+@tab_body(tabs[1], state=view_state)
+def priority_pie_tab():
     st.subheader("🧩 Priority-wise Deal Split")
     if "DEAL_PRIORITY" in df.columns:
         fig = px.pie(df, names="DEAL_PRIORITY", title="Deal Distribution by Priority")
         st.plotly_chart(fig, use_container_width=True)
 
 # --- Tab 2: Analyst View ---
-with tabs[2]:
+@tab_body(tabs[2], state=view_state)
+def analyst_view_tab():
     st.subheader("👤 Analyst Activity")
     if {"ANALYST", "STATUS"}.issubset(df.columns):
-        count = df.groupby(["ANALYST", "STATUS"]).size().reset_index(name="Deals")
+        count = df.groupby(["ANALYST", "STATUS"], observed=True).size().reset_index(name="Deals")
         fig = px.bar(count, x="ANALYST", y="Deals", color="STATUS", barmode="group")
         st.plotly_chart(fig, use_container_width=True)
 
 # --- Tab 3: Sector Analysis ---
-with tabs[3]:
+@tab_body(tabs[3], state=view_state)
+def sector_analysis_tab():
     st.subheader("🏢 Sector vs Deal Stage")
     if {"COMPANY_SECTOR", "DEAL_STAGE"}.issubset(df.columns):
-        grp = df.groupby(["COMPANY_SECTOR", "DEAL_STAGE"]).size().reset_index(name="Deals")
+        grp = df.groupby(["COMPANY_SECTOR", "DEAL_STAGE"], observed=True).size().reset_index(name="Deals")
         fig = px.bar(grp, x="COMPANY_SECTOR", y="Deals", color="DEAL_STAGE", barmode="stack")
         st.plotly_chart(fig, use_container_width=True)
 
 # --- Tab 4: Trends ---
-with tabs[4]:
+@tab_body(tabs[4], state=view_state)
+def trends_tab():
     st.subheader("📈 Deal Progress Over Time")
     if {"DATE", "DEAL_STAGE"}.issubset(df.columns):
-        trend = df.groupby(["DATE", "DEAL_STAGE"]).size().reset_index(name="Count")
+        trend = df.groupby(["DATE", "DEAL_STAGE"], observed=True).size().reset_index(name="Count")
         fig = px.line(trend, x="DATE", y="Count", color="DEAL_STAGE", markers=True)
         st.plotly_chart(fig, use_container_width=True)
 
 # --- Tab 5: Match Score ---
-with tabs[5]:
+@tab_body(tabs[5], state=view_state)
+def match_score_tab():
     st.subheader("🧠 Match Score Distribution")
     if "MATCH_SCORE" in df.columns:
         fig = px.histogram(df, x="MATCH_SCORE", nbins=20, title="Match Score Histogram")
         st.plotly_chart(fig, use_container_width=True)
 
 # --- Tab 6: Mandate & NDA ---
-with tabs[6]:
+@tab_body(tabs[6], state=view_state)
+def mandate_nda_tab():
     st.subheader("📂 Mandate Signed vs NDA Status")
     if {"MANDATE_SIGNED", "NDA_SIGNED_STATUS"}.issubset(df.columns):
         grp = df.groupby(["MANDATE_SIGNED", "NDA_SIGNED_STATUS"]).size().reset_index(name="Deals")
@@ -113,7 +126,8 @@ with tabs[6]:
         st.plotly_chart(fig, use_container_width=True)
 
 # --- Tab 7: Strategic Fit ---
-with tabs[7]:
+@tab_body(tabs[7], state=view_state)
+def strategic_fit_tab():
     st.subheader("🧾 Strategic Fit Notes")
     if "STRATEGIC_FIT_NOTES" in df.columns:
         fit = df["STRATEGIC_FIT_NOTES"].value_counts().reset_index()
@@ -122,15 +136,20 @@ with tabs[7]:
         st.plotly_chart(fig, use_container_width=True)
 
 # --- Tab 8: DD vs Investor Type ---
-with tabs[8]:
+@tab_body(tabs[8], state=view_state)
+def dd_vs_investor_type_tab():
     st.subheader("🔍 Due Diligence by Investor Type")
     if {"DUE_DILIGENCE_STATUS", "INVESTOR_TYPE"}.issubset(df.columns):
-        grp = df.groupby(["INVESTOR_TYPE", "DUE_DILIGENCE_STATUS"]).size().reset_index(name="Deals")
+        grp = df.groupby(["INVESTOR_TYPE", "DUE_DILIGENCE_STATUS"], observed=True).size().reset_index(name="Deals")
         fig = px.bar(grp, x="INVESTOR_TYPE", y="Deals", color="DUE_DILIGENCE_STATUS", barmode="group")
         st.plotly_chart(fig, use_container_width=True)
 
 # --- Tab 9: Raw Data ---
-with tabs[9]:
+@tab_body(tabs[9])
+def raw_data_tab():
     st.subheader("📋 Complete Filtered Dataset")
-    st.dataframe(df, use_container_width=True)
-    st.download_button("⬇️ Download Data", df.to_csv(index=False), file_name="Filtered_EDeal_Data.csv")
+    paged_grid(df, key="raw", state=view_state)
+    download_button("⬇️ Download Data", df, "Filtered_EDeal_Data", state=view_state)
+
+# --- Performance (opt-in sidebar panel) ---
+performance_panel()
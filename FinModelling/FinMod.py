@@ -1,11 +1,22 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from pathlib import Path
+import sys
+
+REPO_ROOT = str(Path(__file__).resolve().parent.parent)
+if REPO_ROOT not in sys.path:  # the script reruns on every interaction
+    sys.path.insert(0, REPO_ROOT)
+from shared.export import download_button
+from shared.filters import filter_index
+from shared.grid import paged_grid
+from shared.loader import dataset_version
+from shared.profiling import performance_panel, span, start_profiling
+from shared.tabs import lazy_tabs, tab_body
 
 # --- Page Config ---
 st.set_page_config(page_title="Financial Modeling Dashboard", layout="wide")
+start_profiling()
 
 # --- Load CSS ---
 def load_css(filename):
@@ -18,37 +29,33 @@ load_css("style.css")
 # --- Top Navbar ---
 st.markdown('<div class="navbar">📊 Financial Modeling & KPI Dashboard</div>', unsafe_allow_html=True)
 
-# --- Load Excel Data ---
-excel_path = Path(__file__).parent / "FinM.xlsx"
-df = pd.read_excel(excel_path, sheet_name="Sheet1")
-df = df.dropna(how="all")
-
 # --- Sidebar Filters ---
 st.sidebar.header("🔍 Filters")
 
 filters = ["KRA", "Analyst", "Activity Name", "Frequency", "Status"]
-for field in filters:
-    if field in df.columns:
-        unique_vals = sorted(df[field].dropna().unique())
-        all_selected = st.sidebar.checkbox(f"Select all {field}", value=True, key=field)
-        selected_vals = unique_vals if all_selected else st.sidebar.multiselect(field, unique_vals, default=unique_vals)
-        df = df[df[field].isin(selected_vals)]
-
-# Ensure proper formats
-df["Period"] = pd.to_datetime(df["Period"], errors="coerce")
-df["Actual Value"] = pd.to_numeric(df["Actual Value"], errors="coerce")
+# Loads the data with its filter bitmaps (built once per data version)
+index = filter_index("finmod", filters)
+selections = {}
+for field in index.columns:
+    unique_vals = index.options[field]
+    all_selected = st.sidebar.checkbox(f"Select all {field}", value=True, key=field)
+    selections[field] = unique_vals if all_selected else st.sidebar.multiselect(field, unique_vals, default=unique_vals)
+df = index.select(selections)
 
 # --- Tabs ---
-tabs = st.tabs([
+# Lazy tabs, replayed per view_state (see shared.tabs)
+view_state = (dataset_version("finmod"), selections)
+tabs = lazy_tabs([
     "📊 Overview", "📌 KRA Explorer", "👤 Analyst Dashboard", "🧮 KPI Metrics",
     "📅 Frequency View", "⚖️ Compare Dimensions", "🧾 Model Types Summary",
     "🎯 Target Analysis", "📂 Metrics Breakdown", "🔍 Status Heatmap",
     "📁 Documentation Activity", "🏆 Analyst Leaderboard", "📈 KRA Leaderboard",
     "🔄 KPI Comparison", "📋 Raw Data"
-])
+], key="tabs")
 
 # --- Tab 0: Overview ---
-with tabs[0]:
+@tab_body(tabs[0], state=view_state)
+def overview_tab():
     st.subheader("📊 Summary Metrics")
     c1, c2, c3 = st.columns(3)
     c1.metric("Total Records", len(df))
@@ -61,17 +68,19 @@ with tabs[0]:
     col2.plotly_chart(px.pie(df, names="Status", title="KPI Status Breakdown"), use_container_width=True)
 
 # --- Tab 1: KRA Explorer ---
-with tabs[1]:
+@tab_body(tabs[1], state=view_state)
+def kra_explorer_tab():
     st.subheader("📌 Activities per KRA")
-    chart = df.groupby(["KRA", "Status"]).size().reset_index(name="Count")
+    chart = df.groupby(["KRA", "Status"], observed=True).size().reset_index(name="Count")
     fig = px.bar(chart, x="KRA", y="Count", color="Status", barmode="stack")
     st.plotly_chart(fig, use_container_width=True)
 
 # --- Tab 2: Analyst Dashboard ---
     
-with tabs[2]:
+@tab_body(tabs[2], state=view_state)
+def analyst_dashboard_tab():
     st.subheader("👤 Analyst Performance")
-    chart = df.groupby(["Analyst", "Status"]).size().reset_index(name="Count")
+    chart = df.groupby(["Analyst", "Status"], observed=True).size().reset_index(name="Count")
     bar_fig = px.bar(chart, x="Analyst", y="Count", color="Status", barmode="group")
     line_fig = px.line(chart, x="Analyst", y="Count", color="Status", markers=True)
     st.plotly_chart(bar_fig, use_container_width=True, key="analyst_bar")
@@ -79,9 +88,10 @@ with tabs[2]:
 
 
 # --- Tab 3: KPI Metrics (Enhanced Visuals) ---
-with tabs[3]:
+@tab_body(tabs[3], state=view_state)
+def kpi_metrics_tab():
     st.subheader("🧮 KPI Trends and Activity Breakdown")
-    df_grouped = df.groupby(["Period", "KRA"]).agg({"Actual Value": "mean"}).reset_index()
+    df_grouped = df.groupby(["Period", "KRA"], observed=True).agg({"Actual Value": "mean"}).reset_index()
 
     bar_fig = go.Figure()
     for kra in df_grouped["KRA"].unique():
@@ -93,7 +103,8 @@ with tabs[3]:
     st.plotly_chart(bar_fig, use_container_width=True)
 
 # --- Tab 4: Frequency View ---
-with tabs[4]:
+@tab_body(tabs[4], state=view_state)
+def frequency_view_tab():
     st.subheader("📅 Frequency Distribution")
     freq = df["Frequency"].value_counts().reset_index()
     freq.columns = ["Frequency", "Count"]
@@ -101,15 +112,17 @@ with tabs[4]:
     st.plotly_chart(fig, use_container_width=True)
 
 # --- Tab 5: Compare Dimensions ---
-with tabs[5]:
+@tab_body(tabs[5])
+def compare_dimensions_tab():
     st.subheader("⚖️ Compare KPI Performance")
     dimension = st.selectbox("Select Dimension to Compare", ["KRA", "Analyst", "Frequency"])
-    comp = df.groupby([dimension, "Status"]).size().reset_index(name="Count")
+    comp = df.groupby([dimension, "Status"], observed=True).size().reset_index(name="Count")
     fig = px.bar(comp, x=dimension, y="Count", color="Status", barmode="group")
     st.plotly_chart(fig, use_container_width=True)
 
 # --- Tab 6: Model Types Summary ---
-with tabs[6]:
+@tab_body(tabs[6], state=view_state)
+def model_types_summary_tab():
     st.subheader("🧾 KPIs by Model Type")
     chart = df["Model Type"].value_counts().reset_index()
     chart.columns = ["Model Type", "Count"]
@@ -117,12 +130,14 @@ with tabs[6]:
     st.plotly_chart(fig, use_container_width=True)
 
 # --- Tab 7: Target Analysis ---
-with tabs[7]:
+@tab_body(tabs[7], state=view_state)
+def target_analysis_tab():
     st.subheader("🎯 Target Value Distribution")
     st.plotly_chart(px.box(df, x="Status", y="Actual Value", color="Status"), use_container_width=True)
 
 # --- Tab 8: Metrics Breakdown ---
-with tabs[8]:
+@tab_body(tabs[8], state=view_state)
+def metrics_breakdown_tab():
     st.subheader("📂 Metrics Used Across KPIs")
     chart = df["Metrics"].value_counts().reset_index()
     chart.columns = ["Metric", "Count"]
@@ -130,14 +145,16 @@ with tabs[8]:
     st.plotly_chart(fig, use_container_width=True)
 
 # --- Tab 9: Status Heatmap (Updated) ---
-with tabs[9]:
+@tab_body(tabs[9], state=view_state)
+def status_heatmap_tab():
     st.subheader("🔍 Status Heatmap by KRA")
-    heat_data = df.groupby(["KRA", "Status"]).size().unstack().fillna(0)
+    heat_data = df.groupby(["KRA", "Status"], observed=True).size().unstack().fillna(0)
     fig = px.imshow(heat_data, text_auto=True, color_continuous_scale='Blues')
     st.plotly_chart(fig, use_container_width=True)
 
 # --- Tab 10: Documentation Activity (Updated) ---
-with tabs[10]:
+@tab_body(tabs[10], state=view_state)
+def documentation_activity_tab():
     st.subheader("📁 Documentation KPIs")
     doc_df = df[df["Frequency"].str.contains("deck|deal|model", case=False, na=False)]
     doc_chart = doc_df["Model Type"].value_counts().reset_index()
@@ -147,14 +164,16 @@ with tabs[10]:
     st.dataframe(doc_df, use_container_width=True)
 
 # --- Tab 11: Analyst Leaderboard ---
-with tabs[11]:
+@tab_body(tabs[11], state=view_state)
+def analyst_leaderboard_tab():
     st.subheader("🏆 Analyst Leaderboard")
     board = df.groupby("Analyst").agg({"Activity Name": "count"}).reset_index()
     board.columns = ["Analyst", "Total KPIs"]
     st.dataframe(board.sort_values("Total KPIs", ascending=False), use_container_width=True)
 
 # --- Tab 12: KRA Leaderboard ---
-with tabs[12]:
+@tab_body(tabs[12], state=view_state)
+def kra_leaderboard_tab():
     st.subheader("📈 KRA Success Leaderboard")
     success = df[df["Status"].isin(["Met", "Exceeded"])]
     score = success.groupby("KRA").size() / df.groupby("KRA").size() * 100
@@ -162,8 +181,10 @@ with tabs[12]:
     st.dataframe(score.sort_values("% Success", ascending=False), use_container_width=True)
 
 # --- Tab 13: KPI Comparison ---
-with tabs[13]:
-    st.subheader("🔄 Compare Two Analysts")
+# Fragment panel: its widgets rerun only this tab (see shared.tabs)
+@st.fragment
+@span("compare analysts")
+def compare_analysts(df):
     options = df["Analyst"].dropna().unique()
     col1, col2 = st.columns(2)
     a1 = col1.selectbox("Select Analyst A", options)
@@ -172,8 +193,17 @@ with tabs[13]:
     fig = px.bar(subset, x="Activity Name", y="Actual Value", color="Analyst", barmode="group")
     st.plotly_chart(fig, use_container_width=True)
 
+@tab_body(tabs[13])
+def kpi_comparison_tab():
+    st.subheader("🔄 Compare Two Analysts")
+    compare_analysts(df)
+
 # --- Tab 14: Raw Data ---
-with tabs[14]:
+@tab_body(tabs[14])
+def raw_data_tab():
     st.subheader("📋 Complete Dataset")
-    st.dataframe(df, use_container_width=True)
-    st.download_button("⬇️ Download Filtered Data", df.to_csv(index=False), file_name="Filtered_KPIs.csv")
+    paged_grid(df, key="raw", state=view_state)
+    download_button("⬇️ Download Filtered Data", df, "Filtered_KPIs", state=view_state)
+
+# --- Performance (opt-in sidebar panel) ---
+performance_panel()
@@ -1,29 +1,30 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+import sys
+from pathlib import Path
+
+REPO_ROOT = str(Path(__file__).resolve().parent.parent)
+if REPO_ROOT not in sys.path:  # the script reruns on every interaction
+    sys.path.insert(0, REPO_ROOT)
+from shared.figures import cached_figure
+from shared.filters import RowView
+from shared.imports import lazy_module
+from shared.loader import dataset_version, derive, load_dataset
+from shared.peers import peer_table
+from shared.profiling import performance_panel, span, start_profiling
+from shared.wordclouds import render_wordcloud, token_table, word_frequencies
 
 st.set_page_config(page_title="Interns Dashboard", layout="wide")
+start_profiling()
 
+# matplotlib and seaborn load with the first chart drawn, after the page has painted
+plt = lazy_module("matplotlib.pyplot")
+sns = lazy_module("seaborn")
 
-# Load the cleaned data (simulate loading for deployed app)
-@st.cache_data
+
+# Load the cleaned data (parsed once per process, re-read only when the file changes)
 def load_data():
-    df = pd.read_excel("OEmployees.xlsx", sheet_name='Sheet2', skiprows=2)
-    df.columns = [
-        "Index", "Sno", "Student Name", "Collage Name", "Phone No.", "Email ID",
-        "Specialisation", "WHO/WFH", "Days Worked", "Allocated Sector",
-        "New Deals Assigned", "Existing Deals Worked", "Priority of Deal",
-        "Attendance Days", "Absences", "Performance Score",
-        "Stakeholder Feedback", "Intern Remarks", "Number"
-    ]
-    df = df.drop(columns=["Index", "Number"])
-    df = df.dropna(subset=["Student Name"])
-    df["Days Worked"] = pd.to_numeric(df["Days Worked"], errors='coerce')
-    df["Attendance Days"] = pd.to_numeric(df["Attendance Days"], errors='coerce')
-    df["Absences"] = pd.to_numeric(df["Absences"], errors='coerce')
-    df["Performance Score"] = pd.to_numeric(df["Performance Score"], errors='coerce')
-    return df
+    # Sheet2 layout (skiprows, column names, blank rows) and numeric types live in shared.datasets
+    return load_dataset("interns")
 
 df = load_data()
 
@@ -38,13 +39,30 @@ with st.sidebar:
     work_mode = st.multiselect("Select Work Mode", df["WHO/WFH"].unique())
     sector = st.multiselect("Select Sector", df["Allocated Sector"].unique())
 
-filtered_df = df.copy()
-if specialisation:
-    filtered_df = filtered_df[filtered_df["Specialisation"].isin(specialisation)]
-if work_mode:
-    filtered_df = filtered_df[filtered_df["WHO/WFH"].isin(work_mode)]
-if sector:
-    filtered_df = filtered_df[filtered_df["Allocated Sector"].isin(sector)]
+# Filters narrow a RowView; the charts get only these columns (see shared.filters)
+CHART_COLUMNS = ["Student Name", "Specialisation", "WHO/WFH", "Allocated Sector", "Priority of Deal",
+                 "New Deals Assigned", "Existing Deals Worked", "Days Worked", "Attendance Days",
+                 "Absences", "Performance Score", "Performance Segment", "Consistency Score",
+                 "Stakeholder Feedback"]
+
+with span("filter"):
+    view = RowView(df)
+    if specialisation:
+        view = view.where(view.isin("Specialisation", specialisation))
+    if work_mode:
+        view = view.where(view.isin("WHO/WFH", work_mode))
+    if sector:
+        view = view.where(view.isin("Allocated Sector", sector))
+    filtered_df = view.project(CHART_COLUMNS)
+# Charts are rendered to PNG once per data version and filter combination
+version = dataset_version("interns")
+view_state = (version, specialisation, work_mode, sector)
+
+# The feedback word cloud is laid out on a worker thread while the charts below are drawn
+feedback_tokens = derive("interns", "feedback_tokens", lambda frame: token_table(frame["Stakeholder Feedback"]))
+feedback_words = word_frequencies(feedback_tokens, filtered_df.index)
+if feedback_words:
+    wordcloud_png = render_wordcloud(feedback_words, background_color='white', width=800, height=400)
 
 # KPI Section
 # ===== ADD THIS SECTION RIGHT AFTER THE KPI METRICS (around line 50) =====
@@ -54,6 +72,15 @@ st.divider()
 # NEW SECTION: INDIVIDUAL INTERN DETAILS
 st.subheader("👤 Individual Intern Performance Explorer")
 
+# Row of each intern and peer-group score summaries, built once per data version
+def first_rows(frame):
+    first = frame.drop_duplicates("Student Name")
+    return dict(zip(first["Student Name"], first.index))
+
+intern_rows = derive("interns", "intern_rows", first_rows)
+PEER_GROUPS = {"Specialization Peers": "Specialisation", "Sector Peers": "Allocated Sector", "All Interns": None}
+peers = peer_table("interns", "Performance Score", PEER_GROUPS)
+
 # Create two columns for better layout
 col1, col2 = st.columns([1, 3])
 
@@ -61,13 +88,13 @@ with col1:
     # Enhanced intern selector with search
     selected_intern = st.selectbox(
         "Select Intern:",
-        df["Student Name"].unique(),
+        list(intern_rows),
         index=0,
         key="intern_selector"
     )
     
     # Quick stats card
-    intern_data = df[df["Student Name"] == selected_intern].iloc[0]
+    intern_data = df.loc[intern_rows[selected_intern]]
     st.markdown(f"""
     **📌 Quick Stats:**
     - **Specialization:** {intern_data['Specialisation']}
@@ -79,15 +106,17 @@ with col1:
 
 with col2:
     # Performance metrics visualization
-    fig_ind, ax_ind = plt.subplots(figsize=(10, 4))
-    metrics = ["Performance Score", "Days Worked", "Attendance Days"]
-    values = [intern_data[m] for m in metrics]
-    ax_ind.barh(metrics, values, color=['#4CAF50', '#2196F3', '#FFC107'])
-    ax_ind.set_title(f"{selected_intern}'s Key Metrics")
-    ax_ind.set_xlim(0, max(values)*1.2)
-    for i, v in enumerate(values):
-        ax_ind.text(v + 1, i, str(v), color='black', va='center')
-    st.pyplot(fig_ind)
+    @cached_figure(state=(version, selected_intern))
+    def intern_metrics():
+        fig_ind, ax_ind = plt.subplots(figsize=(10, 4))
+        metrics = ["Performance Score", "Days Worked", "Attendance Days"]
+        values = [intern_data[m] for m in metrics]
+        ax_ind.barh(metrics, values, color=['#4CAF50', '#2196F3', '#FFC107'])
+        ax_ind.set_title(f"{selected_intern}'s Key Metrics")
+        ax_ind.set_xlim(0, max(values)*1.2)
+        for i, v in enumerate(values):
+            ax_ind.text(v + 1, i, str(v), color='black', va='center')
+        return fig_ind
 
 # Detailed feedback section
 st.markdown("""
@@ -105,25 +134,27 @@ compare_col1, compare_col2, compare_col3 = st.columns(3)
 with compare_col1:
     compare_mode = st.radio(
         "Compare with:",
-        ["Specialization Peers", "Sector Peers", "All Interns"],
+        list(PEER_GROUPS),
         horizontal=True
     )
 
-# Prepare comparison data
-if compare_mode == "Specialization Peers":
-    compare_df = df[df["Specialisation"] == intern_data["Specialisation"]]
-elif compare_mode == "Sector Peers":
-    compare_df = df[df["Allocated Sector"] == intern_data["Allocated Sector"]]
-else:
-    compare_df = df
-
-fig_compare, ax_compare = plt.subplots(figsize=(10, 5))
-sns.boxplot(data=compare_df, y="Performance Score", ax=ax_compare, color="lightblue")
-ax_compare.scatter(0, intern_data["Performance Score"], color='red', s=100, label="Selected Intern")
-ax_compare.set_title(f"Performance Comparison ({compare_mode})")
-ax_compare.legend()
-ax_compare.set_xticklabels([])
-st.pyplot(fig_compare)
+# Look up the precomputed peer distribution instead of re-filtering the frame
+peer_stats, peer_rank = peers.lookup(compare_mode, intern_rows[selected_intern])
+if peer_rank is not None:
+    compare_col2.metric("Percentile among peers", f"{peer_rank:.0f}")
+
+@cached_figure(state=(version, selected_intern, compare_mode))
+def performance_comparison():
+    fig_compare, ax_compare = plt.subplots(figsize=(10, 5))
+    if peer_stats is not None:
+        ax_compare.bxp([peer_stats], positions=[0], widths=0.8, capwidths=0.4, patch_artist=True,
+                       boxprops={"facecolor": "lightblue"}, medianprops={"color": "black"})
+    ax_compare.set_ylabel("Performance Score")
+    ax_compare.scatter(0, intern_data["Performance Score"], color='red', s=100, label="Selected Intern")
+    ax_compare.set_title(f"Performance Comparison ({compare_mode})")
+    ax_compare.legend()
+    ax_compare.set_xticklabels([])
+    return fig_compare
 
 st.divider()
 # ===== END OF NEW SECTION =====
@@ -139,36 +170,44 @@ st.divider()
 
 # Charts
 st.subheader("📍 Work Mode Distribution")
-fig1, ax1 = plt.subplots()
-filtered_df["WHO/WFH"].value_counts().plot.pie(autopct='%1.1f%%', startangle=90, ax=ax1)
-ax1.set_ylabel('')
-ax1.set_title("WHO vs WFH Distribution")
-st.pyplot(fig1)
+@cached_figure(state=view_state)
+def work_mode_pie():
+    fig1, ax1 = plt.subplots()
+    filtered_df["WHO/WFH"].value_counts().plot.pie(autopct='%1.1f%%', startangle=90, ax=ax1)
+    ax1.set_ylabel('')
+    ax1.set_title("WHO vs WFH Distribution")
+    return fig1
 
 st.subheader("📊 Deals Assigned vs. Worked")
-fig2, ax2 = plt.subplots(figsize=(10, 6))
-x = range(len(filtered_df))
-ax2.bar(x, filtered_df["New Deals Assigned"], width=0.4, label='New Deals')
-ax2.bar([i + 0.4 for i in x], filtered_df["Existing Deals Worked"], width=0.4, label='Existing Deals')
-ax2.set_xticks([i + 0.2 for i in x])
-ax2.set_xticklabels(filtered_df["Student Name"], rotation=45, ha='right')
-ax2.set_title("Deals Overview")
-ax2.legend()
-st.pyplot(fig2)
+@cached_figure(state=view_state)
+def deals_overview():
+    fig2, ax2 = plt.subplots(figsize=(10, 6))
+    x = range(len(filtered_df))
+    ax2.bar(x, filtered_df["New Deals Assigned"], width=0.4, label='New Deals')
+    ax2.bar([i + 0.4 for i in x], filtered_df["Existing Deals Worked"], width=0.4, label='Existing Deals')
+    ax2.set_xticks([i + 0.2 for i in x])
+    ax2.set_xticklabels(filtered_df["Student Name"], rotation=45, ha='right')
+    ax2.set_title("Deals Overview")
+    ax2.legend()
+    return fig2
 
 st.subheader("📈 Performance Score Distribution")
-fig3, ax3 = plt.subplots()
-sns.histplot(filtered_df["Performance Score"], bins=10, kde=True, ax=ax3)
-ax3.set_title("Performance Score Histogram")
-st.pyplot(fig3)
+@cached_figure(state=view_state)
+def performance_histogram():
+    fig3, ax3 = plt.subplots()
+    sns.histplot(filtered_df["Performance Score"], bins=10, kde=True, ax=ax3)
+    ax3.set_title("Performance Score Histogram")
+    return fig3
 
 st.subheader("📌 Stakeholder Feedback Count")
-fig4, ax4 = plt.subplots()
-filtered_df["Stakeholder Feedback"].value_counts().plot(kind='bar', ax=ax4)
-ax4.set_title("Feedback Overview")
-ax4.set_ylabel("Count")
-ax4.set_xlabel("Feedback")
-st.pyplot(fig4)
+@cached_figure(state=view_state)
+def feedback_counts():
+    fig4, ax4 = plt.subplots()
+    filtered_df["Stakeholder Feedback"].value_counts().plot(kind='bar', ax=ax4)
+    ax4.set_title("Feedback Overview")
+    ax4.set_ylabel("Count")
+    ax4.set_xlabel("Feedback")
+    return fig4
 
 st.subheader("🏆 Top 5 Interns by Performance")
 top_performers = filtered_df.sort_values(by="Performance Score", ascending=False).head(5)
@@ -180,74 +219,80 @@ st.markdown("✅ *All data is dynamically filterable from the sidebar. Please ap
 
 
 st.subheader("📌 Correlation Heatmap Between Numeric Metrics")
-numeric_cols = ["Days Worked", "Attendance Days", "Absences", "Performance Score"]
-corr = filtered_df[numeric_cols].corr()
-fig5, ax5 = plt.subplots(figsize=(8, 6))
-sns.heatmap(corr, annot=True, cmap="coolwarm", fmt=".2f", ax=ax5)
-ax5.set_title("Correlation Heatmap")
-st.pyplot(fig5)
+@cached_figure(state=view_state)
+def correlation_heatmap():
+    numeric_cols = ["Days Worked", "Attendance Days", "Absences", "Performance Score"]
+    corr = filtered_df[numeric_cols].corr()
+    fig5, ax5 = plt.subplots(figsize=(8, 6))
+    sns.heatmap(corr, annot=True, cmap="coolwarm", fmt=".2f", ax=ax5)
+    ax5.set_title("Correlation Heatmap")
+    return fig5
 
 st.subheader("📋 Deal Priority Distribution")
-fig6, ax6 = plt.subplots()
-filtered_df["Priority of Deal"].value_counts().plot(kind='bar', color='skyblue', ax=ax6)
-ax6.set_title("Deal Priority Count")
-ax6.set_ylabel("Count")
-ax6.set_xlabel("Priority Level")
-st.pyplot(fig6)
+@cached_figure(state=view_state)
+def priority_counts():
+    fig6, ax6 = plt.subplots()
+    filtered_df["Priority of Deal"].value_counts().plot(kind='bar', color='skyblue', ax=ax6)
+    ax6.set_title("Deal Priority Count")
+    ax6.set_ylabel("Count")
+    ax6.set_xlabel("Priority Level")
+    return fig6
 
 st.subheader("🎓 Specialisation vs Performance (Box Plot)")
-fig7, ax7 = plt.subplots(figsize=(10, 6))
-sns.boxplot(data=filtered_df, x="Specialisation", y="Performance Score", ax=ax7)
-ax7.set_title("Performance by Specialisation")
-ax7.set_xticklabels(ax7.get_xticklabels(), rotation=30)
-st.pyplot(fig7)
+@cached_figure(state=view_state)
+def specialisation_boxplot():
+    fig7, ax7 = plt.subplots(figsize=(10, 6))
+    sns.boxplot(data=filtered_df, x="Specialisation", y="Performance Score", ax=ax7)
+    ax7.set_title("Performance by Specialisation")
+    ax7.set_xticklabels(ax7.get_xticklabels(), rotation=30)
+    return fig7
 
 st.subheader("🏢 Sector-wise Average Performance")
-sector_perf = filtered_df.groupby("Allocated Sector")["Performance Score"].mean().sort_values()
-fig8, ax8 = plt.subplots()
-sector_perf.plot(kind='barh', color='mediumseagreen', ax=ax8)
-ax8.set_title("Avg. Performance Score by Sector")
-ax8.set_xlabel("Avg Performance Score")
-st.pyplot(fig8)
+@cached_figure(state=view_state)
+def sector_performance():
+    sector_perf = filtered_df.groupby("Allocated Sector")["Performance Score"].mean().sort_values()
+    fig8, ax8 = plt.subplots()
+    sector_perf.plot(kind='barh', color='mediumseagreen', ax=ax8)
+    ax8.set_title("Avg. Performance Score by Sector")
+    ax8.set_xlabel("Avg Performance Score")
+    return fig8
 
 # SECTION A: SMART SEGMENTATION & INSIGHTS
 
 st.subheader("🧠 Performance Segmentation")
-def segment(score):
-    if score >= 8:
-        return "High"
-    elif score >= 5:
-        return "Medium"
-    else:
-        return "Low"
-
-filtered_df["Performance Segment"] = filtered_df["Performance Score"].apply(segment)
-segment_count = filtered_df["Performance Segment"].value_counts()
-fig9, ax9 = plt.subplots()
-segment_count.plot(kind='bar', color=["green", "orange", "red"], ax=ax9)
-ax9.set_title("Interns by Performance Segment")
-st.pyplot(fig9)
+# "Performance Segment" and "Consistency Score" are computed at ingest (see shared.datasets)
+@cached_figure(state=view_state)
+def segment_counts():
+    segment_count = filtered_df["Performance Segment"].value_counts()
+    fig9, ax9 = plt.subplots()
+    segment_count.plot(kind='bar', color=["green", "orange", "red"], ax=ax9)
+    ax9.set_title("Interns by Performance Segment")
+    return fig9
 
 st.subheader("📉 Absences vs Performance")
-fig10, ax10 = plt.subplots()
-sns.scatterplot(data=filtered_df, x="Absences", y="Performance Score", hue="Performance Segment", palette="Set2", ax=ax10)
-ax10.set_title("Impact of Absences on Performance")
-st.pyplot(fig10)
+@cached_figure(state=view_state)
+def absences_vs_performance():
+    fig10, ax10 = plt.subplots()
+    sns.scatterplot(data=filtered_df, x="Absences", y="Performance Score", hue="Performance Segment", palette="Set2", ax=ax10)
+    ax10.set_title("Impact of Absences on Performance")
+    return fig10
 
 st.subheader("🏡 WFH vs WHO Comparison")
-fig11, axs = plt.subplots(1, 3, figsize=(15, 5))
+@cached_figure(state=view_state)
+def work_mode_comparison():
+    fig11, axs = plt.subplots(1, 3, figsize=(15, 5))
 
-sns.boxplot(data=filtered_df, x="WHO/WFH", y="Performance Score", ax=axs[0])
-axs[0].set_title("Performance by Work Mode")
+    sns.boxplot(data=filtered_df, x="WHO/WFH", y="Performance Score", ax=axs[0])
+    axs[0].set_title("Performance by Work Mode")
 
-sns.boxplot(data=filtered_df, x="WHO/WFH", y="Attendance Days", ax=axs[1])
-axs[1].set_title("Attendance by Work Mode")
+    sns.boxplot(data=filtered_df, x="WHO/WFH", y="Attendance Days", ax=axs[1])
+    axs[1].set_title("Attendance by Work Mode")
 
-sns.boxplot(data=filtered_df, x="WHO/WFH", y="New Deals Assigned", ax=axs[2])
-axs[2].set_title("New Deals by Work Mode")
+    sns.boxplot(data=filtered_df, x="WHO/WFH", y="New Deals Assigned", ax=axs[2])
+    axs[2].set_title("New Deals by Work Mode")
 
-plt.tight_layout()
-st.pyplot(fig11)
+    fig11.tight_layout()
+    return fig11
 
 # SECTION B: ANALYTICAL HIGHLIGHTS
 
@@ -263,26 +308,29 @@ st.dataframe(outliers_df[["Student Name", "Performance Score", "Specialisation",
 
 st.subheader("📈 Interns Consistency Score")
 
-filtered_df["Consistency Score"] = (
-    (filtered_df["Days Worked"] - filtered_df["Absences"]) / filtered_df["Days Worked"]
-).round(2)
-
-fig12, ax12 = plt.subplots()
-sns.histplot(filtered_df["Consistency Score"], bins=10, kde=True, color='purple', ax=ax12)
-ax12.set_title("Interns' Consistency Score Distribution")
-st.pyplot(fig12)
+@cached_figure(state=view_state)
+def consistency_histogram():
+    fig12, ax12 = plt.subplots()
+    sns.histplot(filtered_df["Consistency Score"], bins=10, kde=True, color='purple', ax=ax12)
+    ax12.set_title("Interns' Consistency Score Distribution")
+    return fig12
 
 # Optional: WordCloud (if textual data is strong enough)
-from wordcloud import WordCloud
-
 st.subheader("💬 Word Cloud: Stakeholder Feedback")
-feedback_text = ' '.join(filtered_df["Stakeholder Feedback"].dropna().astype(str).tolist())
-
-if feedback_text.strip():
-    wordcloud = WordCloud(background_color='white', width=800, height=400).generate(feedback_text)
-    fig13, ax13 = plt.subplots(figsize=(10, 5))
-    ax13.imshow(wordcloud, interpolation='bilinear')
-    ax13.axis('off')
-    st.pyplot(fig13)
+
+if feedback_words:
+    wordcloud_slot = st.empty()
+    if not wordcloud_png.done():
+        wordcloud_slot.info("Generating word cloud…")
+    with span("wordcloud wait"):
+        try:
+            png = wordcloud_png.result()
+        except Exception as exc:  # the rest of the page does not depend on the cloud
+            wordcloud_slot.warning(f"Could not draw the word cloud: {exc}")
+        else:
+            wordcloud_slot.image(png, width="stretch")
 else:
     st.info("Not enough feedback data to generate a word cloud.")
+
+# --- Performance (opt-in sidebar panel) ---
+performance_panel()
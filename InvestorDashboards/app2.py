@@ -1,16 +1,29 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
-
-# Load data
+import sys
 from pathlib import Path
-excel_path = Path(__file__).parent / "InvetorDashboard.xlsx"
-df = pd.read_excel(excel_path)
-
 
-df = df.dropna(how='all')  # drop blank rows
+REPO_ROOT = str(Path(__file__).resolve().parent.parent)
+if REPO_ROOT not in sys.path:  # the script reruns on every interaction
+    sys.path.insert(0, REPO_ROOT)
+from shared.cube import count_cube
+from shared.export import download_button
+from shared.filters import FacetCounter, filter_index
+from shared.loader import dataset_version
+from shared.profiling import performance_panel, start_profiling
+from shared.tabs import lazy_tabs, tab_body
 
 st.set_page_config(layout="wide")
+start_profiling()
+
+# Load data together with its filter bitmaps (built once per data version)
+filter_columns = [
+    "Point of Contact", "Designation", "Sector Interest", "Ticket Size", "Investment Stage",
+    "Source of Capital", "Investment Strategy", "Geography", "Market Type"
+]
+index = filter_index("investor", filter_columns)
+cube = count_cube("investor", filter_columns)
+df = index.frame.copy(deep=False)  # the index holds the shared cached frame
 
 # Apply large font and graph style globally
 st.markdown("""
@@ -28,130 +41,147 @@ st.markdown("""
 # Sidebar filters
 st.sidebar.header("🔍 Filter Investors")
 
+def current_selection(label):
+    """Selection of ``label`` for this rerun, read before its widgets are drawn."""
+    if st.session_state.get(f"Select all for {label}", True):
+        return index.options[label]
+    return st.session_state.get(label) or index.options[label]
+
+# Facet counts (investors each option would match under the other filters)
+facets = st.session_state.setdefault("facets", FacetCounter()).counts(
+    index, {col: current_selection(col) for col in filter_columns}
+)
+
 # ✅ Improved multi-select filter with Select All checkbox
-def dropdown_filter(label, col_data):
-    unique_vals = sorted([opt for opt in col_data.unique() if pd.notna(opt)])
-    all_selected = st.sidebar.checkbox(f"Select all for {label}", value=True)
+def dropdown_filter(label):
+    unique_vals = index.options[label]
+    counts = facets[label]
+    all_selected = st.sidebar.checkbox(f"Select all for {label}", value=True, key=f"Select all for {label}")
     if all_selected:
         return unique_vals
     else:
-        choice = st.sidebar.multiselect(label, unique_vals)
+        choice = st.sidebar.multiselect(label, unique_vals, key=label,
+                                        format_func=lambda value: f"{value} ({counts[value]})")
         return choice if choice else unique_vals
 
-# Filters
-poc_filter = dropdown_filter("Point of Contact", df["Point of Contact"])
-designation_filter = dropdown_filter("Designation", df["Designation"])
-sector_filter = dropdown_filter("Sector Interest", df["Sector Interest"])
-ticket_filter = dropdown_filter("Ticket Size", df["Ticket Size"])
-stage_filter = dropdown_filter("Investment Stage", df["Investment Stage"])
-source_filter = dropdown_filter("Source of Capital", df["Source of Capital"])
-strategy_filter = dropdown_filter("Investment Strategy", df["Investment Strategy"])
-geo_filter = dropdown_filter("Geography", df["Geography"])
-market_filter = dropdown_filter("Market Type", df["Market Type"])
-
-# Apply filters
-df_filtered = df[
-    df["Point of Contact"].isin(poc_filter) &
-    df["Designation"].isin(designation_filter) &
-    df["Sector Interest"].isin(sector_filter) &
-    df["Ticket Size"].isin(ticket_filter) &
-    df["Investment Stage"].isin(stage_filter) &
-    df["Source of Capital"].isin(source_filter) &
-    df["Investment Strategy"].isin(strategy_filter) &
-    df["Geography"].isin(geo_filter) &
-    df["Market Type"].isin(market_filter)
-]
+# Filters, applied as one bitmap AND over the precomputed index
+selections = {col: dropdown_filter(col) for col in filter_columns}
+df_filtered = index.select(selections)
+
+def counts(*by):
+    """Investor counts per ``by`` combination under the filters, sliced from the cube."""
+    return cube.counts(selections, list(by))
 
 # Dashboard Tabs
 st.title("💼 Investor Dashboard")
-tabs = st.tabs([
+# Lazy tabs, replayed per view_state (see shared.tabs)
+view_state = (dataset_version("investor"), selections)
+tabs = lazy_tabs([
     "🏠 Home", "📈 Sector Analysis", "💰 Ticket Size", "📋 Strategy", "👥 Intern Tracker", 
     "🌍 Geography", "📇 Contact Sheet", "📌 Top Investors", "🔗 Strategy Matrix",
     "📊 Sector vs Strategy", "🧭 Stage vs Geography", "💼 Intern vs Investment Stage", "🏢 Designation vs Source of Capital"
-])
+], key="tabs")
 
 # Home Tab
-with tabs[0]:
+@tab_body(tabs[0], state=view_state)
+def home_tab():
     st.subheader("📊 Overview")
     c1, c2, c3, c4 = st.columns(4)
+    sector_counts = counts('Sector Interest')
+    stage_counts = counts('Investment Stage')
     c1.metric("Total Investors", len(df_filtered))
-    c2.metric("Unique Sectors", df_filtered['Sector Interest'].nunique())
-    c3.metric("Total POCs", df_filtered['Point of Contact'].nunique())
-    c4.metric("Top Stage", df_filtered['Investment Stage'].mode()[0] if not df_filtered['Investment Stage'].isna().all() else "N/A")
+    c2.metric("Unique Sectors", len(sector_counts))
+    c3.metric("Total POCs", len(counts('Point of Contact')))
+    c4.metric("Top Stage", stage_counts.loc[stage_counts['Count'].idxmax(), 'Investment Stage'] if len(stage_counts) else "N/A")
 
-    st.plotly_chart(px.bar(df_filtered, x='Sector Interest', title='Investor Count by Sector'))
-    st.plotly_chart(px.pie(df_filtered, names='Geography', title='Geography Distribution'))
-    st.plotly_chart(px.treemap(df_filtered, path=['Investment Strategy', 'Investment Stage'], title='Strategy vs Stage'))
+    st.plotly_chart(px.bar(sector_counts, x='Sector Interest', y='Count', title='Investor Count by Sector'))
+    st.plotly_chart(px.pie(counts('Geography'), names='Geography', values='Count', title='Geography Distribution'))
+    st.plotly_chart(px.treemap(counts('Investment Strategy', 'Investment Stage'), path=['Investment Strategy', 'Investment Stage'], values='Count', title='Strategy vs Stage'))
 
 # Sector Analysis
-with tabs[1]:
+@tab_body(tabs[1], state=view_state)
+def sector_analysis_tab():
     st.subheader("📈 Sector Analysis")
-    st.plotly_chart(px.histogram(df_filtered, x='Sector Interest', color='Investment Stage', barmode='group'))
+    st.plotly_chart(px.bar(counts('Sector Interest', 'Investment Stage'), x='Sector Interest', y='Count', color='Investment Stage', barmode='group'))
 
 # Ticket Size
-with tabs[2]:
+@tab_body(tabs[2], state=view_state)
+def ticket_size_tab():
     st.subheader("💰 Ticket Size Analysis")
-    st.plotly_chart(px.histogram(df_filtered, x='Ticket Size', title='Ticket Size Distribution'))
-    st.plotly_chart(px.histogram(df_filtered, x='Investment Stage', color='Ticket Size', title='Stage vs Ticket Size'))
+    st.plotly_chart(px.bar(counts('Ticket Size'), x='Ticket Size', y='Count', title='Ticket Size Distribution'))
+    st.plotly_chart(px.bar(counts('Investment Stage', 'Ticket Size'), x='Investment Stage', y='Count', color='Ticket Size', title='Stage vs Ticket Size'))
 
 # Strategy
-with tabs[3]:
+@tab_body(tabs[3], state=view_state)
+def strategy_tab():
     st.subheader("📋 Strategy and Source")
-    st.plotly_chart(px.bar(df_filtered, x='Investment Strategy', title='Investment Strategy Count'))
-    st.plotly_chart(px.sunburst(df_filtered, path=['Source of Capital', 'Investment Strategy'], title='Source vs Strategy'))
+    st.plotly_chart(px.bar(counts('Investment Strategy'), x='Investment Strategy', y='Count', title='Investment Strategy Count'))
+    st.plotly_chart(px.sunburst(counts('Source of Capital', 'Investment Strategy'), path=['Source of Capital', 'Investment Strategy'], values='Count', title='Source vs Strategy'))
 
 # Intern Tracker
-with tabs[4]:
+@tab_body(tabs[4], state=view_state)
+def intern_tracker_tab():
     st.subheader("👥 Intern Tracker")
-    intern_data = df_filtered['Point of Contact'].value_counts().reset_index()
+    intern_data = counts('Point of Contact').sort_values('Count', ascending=False, kind='stable')
     intern_data.columns = ['Point of Contact', 'Investor Count']
     st.plotly_chart(px.bar(intern_data, x='Point of Contact', y='Investor Count', title='Investors per Intern'))
     st.dataframe(df_filtered[['Company name', 'Investor Name', 'Point of Contact']])
 
 # Geography
-with tabs[5]:
+@tab_body(tabs[5], state=view_state)
+def geography_tab():
     st.subheader("🌍 Investor Geography")
-    st.plotly_chart(px.bar(df_filtered, x='Geography', title='Investors by Geography'))
+    st.plotly_chart(px.bar(counts('Geography'), x='Geography', y='Count', title='Investors by Geography'))
 
 # Contact Sheet
-with tabs[6]:
+@tab_body(tabs[6])
+def contact_sheet_tab():
     st.subheader("📇 Contact Sheet")
     st.dataframe(df_filtered[['Company name', 'Investor Name', 'Designation', 'Linkedin ID', 'Email Id', 'Phone No.']])
-    st.download_button("Download CSV", df_filtered.to_csv(index=False), file_name='Filtered_Investors.csv')
+    download_button("Download", df_filtered, "Filtered_Investors", state=view_state)
 
 # Top Investors
-with tabs[7]:
+@tab_body(tabs[7], state=view_state)
+def top_investors_tab():
     st.subheader("📌 Top Investors by Ticket Size")
     top_investors = df_filtered[~df_filtered['Ticket Size'].isna()]
     top_investors = top_investors.sort_values(by='Ticket Size', ascending=False)
     st.dataframe(top_investors[['Investor Name', 'Company name', 'Ticket Size', 'Investment Stage', 'Sector Interest']].head(10))
 
 # Strategy Matrix
-with tabs[8]:
+@tab_body(tabs[8], state=view_state)
+def strategy_matrix_tab():
     st.subheader("🔗 Strategy Matrix: Stage vs Strategy")
-    matrix_data = df_filtered.pivot_table(index='Investment Strategy', columns='Investment Stage', aggfunc='size', fill_value=0)
+    matrix_data = counts('Investment Strategy', 'Investment Stage').pivot(index='Investment Strategy', columns='Investment Stage', values='Count').fillna(0).astype(int)
     st.dataframe(matrix_data.style.background_gradient(cmap='Blues'))
 
 # Sector vs Strategy
-with tabs[9]:
+@tab_body(tabs[9], state=view_state)
+def sector_vs_strategy_tab():
     st.subheader("📊 Sector vs Investment Strategy")
-    sector_strategy = df_filtered.groupby(['Sector Interest', 'Investment Strategy']).size().reset_index(name='Count')
+    sector_strategy = counts('Sector Interest', 'Investment Strategy')
     st.plotly_chart(px.density_heatmap(sector_strategy, x='Sector Interest', y='Investment Strategy', z='Count', color_continuous_scale='Plasma'))
 
 # Stage vs Geography
-with tabs[10]:
+@tab_body(tabs[10], state=view_state)
+def stage_vs_geography_tab():
     st.subheader("🧭 Investment Stage vs Geography")
-    stage_geo = df_filtered.groupby(['Investment Stage', 'Geography']).size().reset_index(name='Count')
+    stage_geo = counts('Investment Stage', 'Geography')
     st.plotly_chart(px.density_heatmap(stage_geo, x='Investment Stage', y='Geography', z='Count', color_continuous_scale='Cividis'))
 
 # Intern vs Investment Stage
-with tabs[11]:
+@tab_body(tabs[11], state=view_state)
+def intern_vs_investment_stage_tab():
     st.subheader("💼 Intern vs Investment Stage")
-    intern_stage = df_filtered.groupby(['Point of Contact', 'Investment Stage']).size().reset_index(name='Count')
+    intern_stage = counts('Point of Contact', 'Investment Stage')
     st.plotly_chart(px.bar(intern_stage, x='Point of Contact', y='Count', color='Investment Stage', barmode='stack', title='Investors per Intern by Stage'))
 
 # Designation vs Source of Capital
-with tabs[12]:
+@tab_body(tabs[12], state=view_state)
+def designation_vs_source_of_capital_tab():
     st.subheader("🏢 Designation vs Source of Capital")
-    designation_source = df_filtered.groupby(['Designation', 'Source of Capital']).size().reset_index(name='Count')
-    st.plotly_chart(px.bar(designation_source, x='Designation', y='Count', color='Source of Capital', barmode='group'))
\ No newline at end of file
+    designation_source = counts('Designation', 'Source of Capital')
+    st.plotly_chart(px.bar(designation_source, x='Designation', y='Count', color='Source of Capital', barmode='group'))
+
+# --- Performance (opt-in sidebar panel) ---
+performance_panel()
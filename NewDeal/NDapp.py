@@ -1,11 +1,22 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from pathlib import Path
+import sys
+
+REPO_ROOT = str(Path(__file__).resolve().parent.parent)
+if REPO_ROOT not in sys.path:  # the script reruns on every interaction
+    sys.path.insert(0, REPO_ROOT)
+from shared.export import download_button
+from shared.filters import filter_index
+from shared.grid import paged_grid
+from shared.loader import dataset_version
+from shared.profiling import performance_panel, start_profiling
+from shared.tabs import lazy_tabs, tab_body
 
 # --- Page Setup ---
 st.set_page_config(page_title="Deal Flow Dashboard", layout="wide")
+start_profiling()
 
 # --- Load Custom CSS ---
 def load_css(filename):
@@ -18,28 +29,23 @@ load_css("style.css")
 # --- Header ---
 st.markdown('<div class="navbar">💼 Deal Flow & Investor Pipeline Dashboard</div>', unsafe_allow_html=True)
 
-# --- Load Excel Data ---
-excel_path = Path(__file__).parent / "ND.xlsx"
-df = pd.read_excel(excel_path)
-df = df.dropna(how="all")
-
-# --- Format Columns ---
-df["Contact Date"] = pd.to_datetime(df["Contact Date"], errors="coerce")
-df["Deal Size (₹ Cr)"] = pd.to_numeric(df["Deal Size (₹ Cr)"], errors="coerce")
-
 # --- Sidebar Filters ---
 st.sidebar.header("🔍 Filters")
 filters = ["Intern Name", "Lead Source", "Sector", "Mapping Status", "Meeting Scheduled", "Deal Stage", "Closure Status", "Term Sheet Status"]
 
-for field in filters:
-    if field in df.columns:
-        unique_vals = sorted(df[field].dropna().unique())
-        all_selected = st.sidebar.checkbox(f"Select all {field}", value=True, key=field)
-        selected_vals = unique_vals if all_selected else st.sidebar.multiselect(field, unique_vals, default=unique_vals)
-        df = df[df[field].isin(selected_vals)]
+# Loads the data with its filter bitmaps (built once per data version)
+index = filter_index("new_deal", filters)
+selections = {}
+for field in index.columns:
+    unique_vals = index.options[field]
+    all_selected = st.sidebar.checkbox(f"Select all {field}", value=True, key=field)
+    selections[field] = unique_vals if all_selected else st.sidebar.multiselect(field, unique_vals, default=unique_vals)
+df = index.select(selections)
 
 # ✅ Only ONE tab definition
-tabs = st.tabs([
+# Lazy tabs, replayed per view_state (see shared.tabs)
+view_state = (dataset_version("new_deal"), selections)
+tabs = lazy_tabs([
     "📊 Overview",
     "📈 Deal Stage Trends",
     "👤 Intern Analysis",
@@ -51,10 +57,11 @@ tabs = st.tabs([
     "🔍 Quality Insights",
     "📤 Investor Engagement",
     "📈 Success Correlation"
-])
+], key="tabs")
 
 # --- Tab 0: Overview ---
-with tabs[0]:
+@tab_body(tabs[0], state=view_state)
+def overview_tab():
     st.subheader("📊 Overall Summary")
     c1, c2, c3 = st.columns(3)
     c1.metric("Total Leads", df["Lead ID"].nunique())
@@ -66,7 +73,8 @@ with tabs[0]:
     col2.plotly_chart(px.pie(df, names="Deal Stage", title="Deal Stage Breakdown"), use_container_width=True)
 
 # --- Tab 1: Deal Stage Trends ---
-with tabs[1]:
+@tab_body(tabs[1], state=view_state)
+def deal_stage_trends_tab():
     st.subheader("📈 Leads Across Deal Stages")
     stage_counts = df["Deal Stage"].value_counts().reset_index()
     stage_counts.columns = ["Deal Stage", "Count"]
@@ -77,7 +85,8 @@ with tabs[1]:
     st.plotly_chart(funnel, use_container_width=True)
 
 # --- Tab 2: Intern Analysis ---
-with tabs[2]:
+@tab_body(tabs[2], state=view_state)
+def intern_analysis_tab():
     st.subheader("👤 Intern Performance")
     intern_summary = df.groupby("Intern Name").agg({
         "Lead ID": "count",
@@ -91,39 +100,44 @@ with tabs[2]:
     st.plotly_chart(fig2, use_container_width=True)
 
 # --- Tab 3: Contact Timeline ---
-with tabs[3]:
+@tab_body(tabs[3], state=view_state)
+def contact_timeline_tab():
     st.subheader("📅 Contacts Over Time")
     timeline = df.groupby("Contact Date").size().reset_index(name="Leads")
     fig = px.line(timeline, x="Contact Date", y="Leads", title="Leads Over Time", markers=True)
     st.plotly_chart(fig, use_container_width=True)
 
 # --- Tab 4: Deal Size Analysis ---
-with tabs[4]:
+@tab_body(tabs[4], state=view_state)
+def deal_size_analysis_tab():
     st.subheader("💰 Deal Size Distribution")
     fig = px.box(df, x="Sector", y="Deal Size (₹ Cr)", points="all", color="Sector", title="Deal Size by Sector")
     st.plotly_chart(fig, use_container_width=True)
 
-    heat_data = df.pivot_table(index="Sector", columns="Deal Stage", values="Deal Size (₹ Cr)", aggfunc="sum", fill_value=0)
+    heat_data = df.pivot_table(index="Sector", columns="Deal Stage", values="Deal Size (₹ Cr)", aggfunc="sum", fill_value=0, observed=True)
     fig2 = px.imshow(heat_data, text_auto=True, title="Heatmap: Deal Size by Sector and Stage", color_continuous_scale="Blues")
     st.plotly_chart(fig2, use_container_width=True)
 
 # --- Tab 5: Raw Data ---
-with tabs[5]:
+@tab_body(tabs[5])
+def raw_data_tab():
     st.subheader("📋 Full Dataset")
-    st.dataframe(df, use_container_width=True)
-    st.download_button("⬇️ Download Filtered Data", df.to_csv(index=False), file_name="Filtered_Deals.csv")
+    paged_grid(df, key="raw", state=view_state)
+    download_button("⬇️ Download Filtered Data", df, "Filtered_Deals", state=view_state)
 
 # --- Tab 6: Deal Stage Comparison ---
-with tabs[6]:
+@tab_body(tabs[6], state=view_state)
+def deal_stage_comparison_tab():
     st.subheader("🧮 Deal Stage by Intern")
-    group = df.groupby(["Intern Name", "Deal Stage"]).size().reset_index(name="Count")
+    group = df.groupby(["Intern Name", "Deal Stage"], observed=True).size().reset_index(name="Count")
     bar = px.bar(group, x="Intern Name", y="Count", color="Deal Stage", barmode="group", title="Deal Stage Distribution per Intern")
     pie = px.pie(df, names="Deal Stage", title="Overall Deal Stage Share", hole=0.4)
     st.plotly_chart(bar, use_container_width=True)
     st.plotly_chart(pie, use_container_width=True)
 
 # --- Tab 7: Top Intern Leaderboard ---
-with tabs[7]:
+@tab_body(tabs[7], state=view_state)
+def top_intern_leaderboard_tab():
     st.subheader("🏆 Top Performing Interns")
     leaderboard = df.groupby("Intern Name")["Deal Size (₹ Cr)"].sum().reset_index().sort_values(by="Deal Size (₹ Cr)", ascending=False)
     st.dataframe(leaderboard, use_container_width=True)
@@ -133,16 +147,18 @@ with tabs[7]:
     st.metric(label="🏅 Top Intern", value=top_intern["Intern Name"], delta=f"₹ {top_intern['Deal Size (₹ Cr)']:.2f} Cr")
 
 # --- Tab 8: Quality Insights ---
-with tabs[8]:
+@tab_body(tabs[8], state=view_state)
+def quality_insights_tab():
     st.subheader("🔍 Quality Rating vs Deal Metrics")
-    heat = df.pivot_table(index="Quality Rating", columns="Closure Status", values="Deal Size (₹ Cr)", aggfunc="sum", fill_value=0)
+    heat = df.pivot_table(index="Quality Rating", columns="Closure Status", values="Deal Size (₹ Cr)", aggfunc="sum", fill_value=0, observed=True)
     fig = px.imshow(heat, text_auto=True, title="Heatmap: Deal Size by Quality Rating & Closure Status")
     st.plotly_chart(fig, use_container_width=True)
     scatter = px.scatter(df, x="Quality Rating", y="Deal Size (₹ Cr)", color="Closure Status", size="Deal Size (₹ Cr)", title="Deal Size vs Quality Rating")
     st.plotly_chart(scatter, use_container_width=True)
 
 # --- Tab 9: Investor Engagement ---
-with tabs[9]:
+@tab_body(tabs[9], state=view_state)
+def investor_engagement_tab():
     st.subheader("📤 Investor Outreach vs Warm Leads")
     fig = px.scatter(df, x="Investor Outreach Count", y="Warm Investor Leads", color="Intern Name", size="Deal Size (₹ Cr)", title="Investor Engagement Bubble Chart")
     st.plotly_chart(fig, use_container_width=True)
@@ -152,9 +168,13 @@ with tabs[9]:
     st.plotly_chart(fig2, use_container_width=True)
 
 # --- Tab 10: Success Correlation ---
-with tabs[10]:
+@tab_body(tabs[10], state=view_state)
+def success_correlation_tab():
     st.subheader("📈 KPI Correlation Heatmap")
     numeric_cols = ["Deal Size (₹ Cr)", "Investor Outreach Count", "Warm Investor Leads", "Quality Rating"]
     corr_df = df[numeric_cols].corr().round(2)
     fig = px.imshow(corr_df, text_auto=True, color_continuous_scale="Viridis", title="Correlation Between Key Metrics")
     st.plotly_chart(fig, use_container_width=True)
+
+# --- Performance (opt-in sidebar panel) ---
+performance_panel()
@@ -2,12 +2,18 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime
-from fpdf import FPDF
-from io import BytesIO
-import base64
+import sys
+from pathlib import Path
+
+REPO_ROOT = str(Path(__file__).resolve().parent.parent)
+if REPO_ROOT not in sys.path:  # the script reruns on every interaction
+    sys.path.insert(0, REPO_ROOT)
+from shared.filters import RowView
+from shared.loader import derive, load_dataset
+from shared.profiling import performance_panel, span, start_profiling
 
 st.set_page_config(page_title="📊 Pitch Evaluation Pro", layout="wide")
+start_profiling()
 
 # ===== Theme Settings =====
 MATERIAL_STYLE = {
@@ -36,55 +42,35 @@ st.markdown(f"""
 """, unsafe_allow_html=True)
 
 # ===== Data Loading =====
-@st.cache_data
 def load_data():
-    # Load data directly from the Excel file path
-    df = pd.read_excel("Pitch_Quality_Commitee.xlsx")
-    df.columns = df.columns.str.strip()  # Clean column names
-    df['Last Updated'] = pd.to_datetime(df['Last Updated'], errors='coerce')
-    df['Reply Rate'] = (df['Total Reply Recived'] / df['Total pitches']) * 100
-    return df
+    # Parsed, typed and given its Reply Rate once per data version (see shared.datasets)
+    return load_dataset("pitch")
+
+
+def intern_cards(frame):
+    """Display record of every row for the Intern Cards tab, built once per data version."""
+    def text(col, default):
+        if col not in frame.columns:
+            return pd.Series(default, index=frame.index)
+        return frame[col].astype(object).where(frame[col].notna(), default)
+
+    return pd.DataFrame({
+        "Title": frame["Intern Name"].astype(str) + " - " + frame["Pitch Company"].astype(str),
+        "University": text("College/University", "N/A"),
+        "Grade": text("Grade", "N/A"),
+        "Score": text("Total Score", "N/A"),
+        "Status": text("Evaluation Status", "N/A"),
+        "Comments": text("Committee Comments", "No comments"),
+        "Pitches": frame["Total pitches"].fillna(0).astype(int),
+        "Replies": frame["Total Reply Recived"].fillna(0).astype(int),
+    }, index=frame.index)
+
 
+CARDS_PER_PAGE = 10
 
 # Load the data
 df = load_data()
-
-@st.cache_data
-def load_data():
-    try:
-        # Debug: Show current directory and files
-        import os
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        st.write(f"Current directory: {current_dir}")
-        st.write(f"Files in directory: {os.listdir(current_dir)}")
-        
-        # Try multiple possible file paths
-        possible_paths = [
-            "Pitch_Quality_Commitee.xlsx",  # Same directory
-            "./Pitch_Quality_Commitee.xlsx",  # Relative path
-            os.path.join(current_dir, "Pitch_Quality_Commitee.xlsx")  # Absolute path
-        ]
-        
-        for path in possible_paths:
-            try:
-                df = pd.read_excel(path)
-                st.success(f"Successfully loaded file from: {path}")
-                
-                # Data processing
-                df.columns = df.columns.str.strip()
-                df['Last Updated'] = pd.to_datetime(df['Last Updated'], errors='coerce')
-                df['Reply Rate'] = (df['Total Reply Recived'] / df['Total pitches']) * 100
-                return df
-                
-            except Exception as e:
-                st.warning(f"Failed to load from {path}: {str(e)}")
-                continue
-                
-        raise FileNotFoundError("Excel file not found in any attempted paths")
-        
-    except Exception as e:
-        st.error(f"Critical error loading data: {str(e)}")
-        return pd.DataFrame()  # Return empty dataframe as fallback
+cards = derive("pitch", "intern_cards", intern_cards)
 
 # ===== Sidebar Filters =====
 
@@ -100,20 +86,25 @@ with st.sidebar:
     intern_name = st.selectbox("Select Intern", ["All"] + df['Intern Name'].unique().tolist())
     date_range = st.date_input("Date Range", [df['Last Updated'].min(), df['Last Updated'].max()])
 
-filtered_df = df.copy()
-if "All" not in sectors:
-    filtered_df = filtered_df[filtered_df['Industry Sector'].isin(sectors)]
-if "All" not in grades:
-    filtered_df = filtered_df[filtered_df['Grade'].isin(grades)]
-if eval_status:
-    filtered_df = filtered_df[filtered_df['Evaluation Status'].isin(eval_status)]
-if intern_name != "All":
-    filtered_df = filtered_df[filtered_df['Intern Name'] == intern_name]
-if date_range:
-    filtered_df = filtered_df[
-        (filtered_df['Last Updated'] >= pd.to_datetime(date_range[0])) &
-        (filtered_df['Last Updated'] <= pd.to_datetime(date_range[1]))
-    ]
+# Filters narrow a RowView; the charts get only these columns (see shared.filters)
+CHART_COLUMNS = ["Intern Name", "Industry Sector", "Grade", "Evaluation Status",
+                 "Total Score", "Reply Rate", "Total pitches", "Last Updated"]
+
+with span("filter"):
+    view = RowView(df)
+    if "All" not in sectors:
+        view = view.where(view.isin('Industry Sector', sectors))
+    if "All" not in grades:
+        view = view.where(view.isin('Grade', grades))
+    if eval_status:
+        view = view.where(view.isin('Evaluation Status', eval_status))
+    if intern_name != "All":
+        view = view.where(view['Intern Name'] == intern_name)
+    if date_range:
+        updated = view['Last Updated']
+        view = view.where((updated >= pd.to_datetime(date_range[0])) &
+                          (updated <= pd.to_datetime(date_range[1])))
+    filtered_df = view.project(CHART_COLUMNS)
 
 # ===== Dashboard Layout =====
 st.title("📊 Pitch Evaluation Dashboard")
@@ -131,7 +122,7 @@ st.markdown("---")
 # ===== Charts Section =====
 tab1, tab2, tab3, tab4 = st.tabs(["Overview", "Performance", "Comparisons", "Intern Cards"])
 
-with tab1:
+with tab1, span("tab overview"):
     st.subheader("Pie Charts & Distributions")
     pie1, pie2 = st.columns(2)
     with pie1:
@@ -139,7 +130,7 @@ with tab1:
     with pie2:
         st.plotly_chart(px.pie(filtered_df, names='Industry Sector', title='Sectors Covered', hole=0.3))
 
-with tab2:
+with tab2, span("tab performance"):
     st.subheader("Performance Charts")
     bar = px.bar(
         filtered_df.groupby('Intern Name')['Total Score'].mean().nlargest(10).reset_index(),
@@ -158,36 +149,52 @@ with tab2:
         size='Total pitches', title='Score vs Reply Rate', hover_name='Intern Name')
     st.plotly_chart(scatter, use_container_width=True)
 
-with tab3:
+with tab3, span("tab comparisons"):
     st.subheader("Comparative Analysis")
     comp = filtered_df.groupby('Industry Sector')[['Total Score', 'Reply Rate']].mean().reset_index()
     st.plotly_chart(px.bar(comp, x='Industry Sector', y='Total Score', title='Avg Score by Sector', color='Total Score'))
     st.plotly_chart(px.bar(comp, x='Industry Sector', y='Reply Rate', title='Avg Reply Rate by Sector', color='Reply Rate'))
 
-with tab4:
+with tab4, span("tab intern cards"):
     st.subheader("Intern Profile Cards")
 
-    # Ensure proper numeric types with fallback
-    filtered_df['Total pitches'] = pd.to_numeric(filtered_df['Total pitches'], errors='coerce').fillna(0)
-    filtered_df['Total Reply Recived'] = pd.to_numeric(filtered_df['Total Reply Recived'], errors='coerce').fillna(0)
-
-    for i, row in filtered_df.iterrows():
-        with st.expander(f"{row['Intern Name']} - {row['Pitch Company']}"):
+    # Card records are precomputed per row; only the visible page builds figures
+    filtered_cards = cards.loc[filtered_df.index]
+
+    if st.toggle("Show all interns in one chart", key="cards_overview"):
+        overview = go.Figure([
+            go.Bar(name="Total Pitches", x=filtered_cards["Title"], y=filtered_cards["Pitches"],
+                   marker_color=MATERIAL_STYLE['primary']),
+            go.Bar(name="Replies Received", x=filtered_cards["Title"], y=filtered_cards["Replies"],
+                   marker_color=MATERIAL_STYLE['accent']),
+        ])
+        overview.update_layout(barmode="group", title="Pitches vs Replies by Intern",
+                               yaxis_title="Count", height=450)
+        st.plotly_chart(overview, use_container_width=True, key="cards_overview_chart")
+
+    pages = max(1, (len(filtered_cards) + CARDS_PER_PAGE - 1) // CARDS_PER_PAGE)
+    if st.session_state.get("cards_page", 1) > pages:
+        st.session_state["cards_page"] = pages
+    page = st.number_input("Page", min_value=1, max_value=pages, step=1, key="cards_page")
+    page_cards = filtered_cards.iloc[(page - 1) * CARDS_PER_PAGE:page * CARDS_PER_PAGE]
+    if len(page_cards):
+        start = (page - 1) * CARDS_PER_PAGE
+        st.caption(f"Cards {start + 1}–{start + len(page_cards)} of {len(filtered_cards)}")
+
+    for i, card in zip(page_cards.index, page_cards.itertuples(index=False)):
+        with st.expander(card.Title):
             col1, col2 = st.columns([3, 2])
             with col1:
-                st.markdown(f"**University:** {row.get('College/University', 'N/A')}")
-                st.markdown(f"**Grade:** {row.get('Grade', 'N/A')}")
-                st.markdown(f"**Score:** {row.get('Total Score', 'N/A')}/10")
-                st.markdown(f"**Status:** {row.get('Evaluation Status', 'N/A')}")
-                st.markdown(f"**Comments:** {row.get('Committee Comments', 'No comments')}")
+                st.markdown(f"**University:** {card.University}")
+                st.markdown(f"**Grade:** {card.Grade}")
+                st.markdown(f"**Score:** {card.Score}/10")
+                st.markdown(f"**Status:** {card.Status}")
+                st.markdown(f"**Comments:** {card.Comments}")
             with col2:
-                total_pitches = int(row["Total pitches"])
-                replies_received = int(row["Total Reply Recived"])
-
                 fig = go.Figure()
                 fig.add_trace(go.Bar(
                     x=["Total Pitches", "Replies Received"],
-                    y=[total_pitches, replies_received],
+                    y=[card.Pitches, card.Replies],
                     marker_color=[MATERIAL_STYLE['primary'], MATERIAL_STYLE['accent']]
                 ))
                 fig.update_layout(
@@ -196,4 +203,7 @@ with tab4:
                     yaxis_title="Count",
                     height=300
                 )
-                st.plotly_chart(fig, use_container_width=True, key=f"bar_{i}")
\ No newline at end of file
+                st.plotly_chart(fig, use_container_width=True, key=f"bar_{i}")
+
+# --- Performance (opt-in sidebar panel) ---
+performance_panel()
@@ -1,13 +1,19 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+import sys
+from pathlib import Path
+
+REPO_ROOT = str(Path(__file__).resolve().parent.parent)
+if REPO_ROOT not in sys.path:  # the script reruns on every interaction
+    sys.path.insert(0, REPO_ROOT)
+from shared.filters import FacetCounter, filter_index
+from shared.profiling import performance_panel, span, start_profiling
 
 # ✅ Page config
 st.set_page_config(page_title="Sell Side Committee Dashboard", layout="wide")
+start_profiling()
 
 # ✅ Load external CSS
-from pathlib import Path
-
 def load_css(filename):
     css_path = Path(__file__).parent / filename
     with open(css_path) as f:
@@ -18,33 +24,49 @@ load_css("style.css")
 # ✅ Top navbar
 st.markdown('<div class="navbar">💼 Sell Side Committee Dashboard</div>', unsafe_allow_html=True)
 
-# ✅ Load data
-from pathlib import Path
-excel_path = Path(__file__).parent / "SellSide.xlsx"
-df = pd.read_excel(excel_path)
+filter_fields = [
+    "Sector", "Sub-Sector", "Business Model", "Location", "Deal Type",
+    "Investor Fit", "Status", "Assigned Analyst"
+]
 
-df = df.dropna(how='all')
+# ✅ Load data together with its filter bitmaps (built once per data version)
+index = filter_index("sellside", filter_fields)
+df = index.frame.copy(deep=False)  # the index holds the shared cached frame
 
 # --- Sidebar Filters ---
 st.sidebar.header("🔍 Filters")
 
+def current_selection(field):
+    """Selection of ``field`` for this rerun, read before its widgets are drawn."""
+    if st.session_state.get(field, True):
+        return index.options[field]
+    return st.session_state.get(f"{field} options", index.options[field])
+
+# Facet counts need every filter's value before the first widget is drawn
+readiness_range = st.session_state.get("readiness", (1, 5))
+readiness = None
+if "Deal Readiness" in df.columns:
+    readiness = df["Deal Readiness"].between(*readiness_range).to_numpy()
+facets = st.session_state.setdefault("facets", FacetCounter()).counts(
+    index, {field: current_selection(field) for field in index.columns},
+    extra=readiness, extra_key=readiness_range,
+)
+
 def dropdown_filter(label, column):
-    unique_vals = sorted(df[column].dropna().unique())
+    unique_vals = index.options[column]
+    counts = facets[column]
     all_selected = st.sidebar.checkbox(f"Select all {label}", value=True, key=label)
-    return unique_vals if all_selected else st.sidebar.multiselect(label, unique_vals, default=unique_vals)
-
-filter_fields = [
-    "Sector", "Sub-Sector", "Business Model", "Location", "Deal Type",
-    "Investor Fit", "Status", "Assigned Analyst"
-]
+    return unique_vals if all_selected else st.sidebar.multiselect(
+        label, unique_vals, default=unique_vals, key=f"{label} options",
+        format_func=lambda value: f"{value} ({counts[value]})",
+    )
 
-for field in filter_fields:
-    if field in df.columns:
-        df = df[df[field].isin(dropdown_filter(field, field))]
+selections = {field: dropdown_filter(field, field) for field in index.columns}
 
 if "Deal Readiness" in df.columns:
-    min_r, max_r = st.sidebar.slider("Deal Readiness (1 to 5)", 1, 5, (1, 5))
-    df = df[df["Deal Readiness"].between(min_r, max_r)]
+    st.sidebar.slider("Deal Readiness (1 to 5)", 1, 5, (1, 5), key="readiness")
+
+df = index.select(selections, extra=readiness)
 
 # --- Tabs ---
 tabs = st.tabs([
@@ -54,7 +76,7 @@ tabs = st.tabs([
 ])
 
 # --- Tab 0: Overview ---
-with tabs[0]:
+with tabs[0], span("tab overview"):
     st.subheader("📊 Summary Metrics")
     c1, c2, c3 = st.columns(3)
     c1.metric("Total Targets", len(df))
@@ -68,27 +90,27 @@ with tabs[0]:
             st.plotly_chart(px.pie(df, names=col, title=f"{col} Distribution"), use_container_width=True)
 
 # --- Tab 1: Sector Trends ---
-with tabs[1]:
+with tabs[1], span("tab sector trends"):
     st.subheader("📊 Sector vs Sub-Sector Trends")
     if "Sector" in df.columns and "Sub-Sector" in df.columns:
-        trend_df = df.groupby(["Sector", "Sub-Sector"]).size().reset_index(name="Count")
+        trend_df = df.groupby(["Sector", "Sub-Sector"], observed=True).size().reset_index(name="Count")
         st.plotly_chart(px.bar(trend_df, x="Sector", y="Count", color="Sub-Sector", barmode="group"), use_container_width=True)
 
 # --- Tab 2: Deal Types ---
-with tabs[2]:
+with tabs[2], span("tab deal types"):
     st.subheader("💼 Deal Type vs Investor Fit")
     if "Deal Type" in df.columns and "Investor Fit" in df.columns:
-        deal_df = df.groupby(["Deal Type", "Investor Fit"]).size().reset_index(name="Count")
+        deal_df = df.groupby(["Deal Type", "Investor Fit"], observed=True).size().reset_index(name="Count")
         st.plotly_chart(px.bar(deal_df, x="Deal Type", y="Count", color="Investor Fit", barmode="group"), use_container_width=True)
 
 # --- Tab 3: Financials ---
-with tabs[3]:
+with tabs[3], span("tab financials"):
     st.subheader("💰 Revenue vs EBITDA Margin")
     if "Revenue (FY24)" in df.columns and "EBITDA Margin" in df.columns:
         st.plotly_chart(px.scatter(df, x="Revenue (FY24)", y="EBITDA Margin", color="Sector", hover_name="Target Company Name"), use_container_width=True)
 
 # --- Tab 4: Analysts ---
-with tabs[4]:
+with tabs[4], span("tab analysts"):
     st.subheader("👥 Analyst Deal Count")
     if "Assigned Analyst" in df.columns:
         analyst_df = df["Assigned Analyst"].value_counts().reset_index()
@@ -96,7 +118,7 @@ with tabs[4]:
         st.plotly_chart(px.bar(analyst_df, x="Analyst", y="Deals", text="Deals", color="Deals"), use_container_width=True)
 
 # --- Tab 5: Locations ---
-with tabs[5]:
+with tabs[5], span("tab locations"):
     st.subheader("📍 Deal Locations")
     if "Location" in df.columns:
         loc_df = df["Location"].value_counts().reset_index()
@@ -104,7 +126,7 @@ with tabs[5]:
         st.plotly_chart(px.bar(loc_df, x="Location", y="Count", color="Count", text="Count"), use_container_width=True)
 
 # --- Tab 6: Contacts ---
-with tabs[6]:
+with tabs[6], span("tab contacts"):
     st.subheader("📇 Contact List")
     contact_cols = ["Target Company Name", "Promoter Name", "Email ID", "Phone No", "Location"]
     available_cols = [col for col in contact_cols if col in df.columns]
@@ -112,21 +134,24 @@ with tabs[6]:
         st.dataframe(df[available_cols], use_container_width=True)
 
 # --- Tab 7: Top Valuations ---
-with tabs[7]:
+with tabs[7], span("tab top valuations"):
     st.subheader("📌 Top 10 Valuation Expectations")
     if "Valuation Expectation" in df.columns:
         top_val = df[~df["Valuation Expectation"].isna()].sort_values(by="Valuation Expectation", ascending=False).head(10)
         st.dataframe(top_val, use_container_width=True)
 
 # --- Tab 8: Matrix ---
-with tabs[8]:
+with tabs[8], span("tab matrix"):
     st.subheader("📈 Deal Type vs Readiness Matrix")
     if "Deal Type" in df.columns and "Deal Readiness" in df.columns:
-        matrix = df.pivot_table(index="Deal Type", columns="Deal Readiness", aggfunc="size", fill_value=0)
+        matrix = df.pivot_table(index="Deal Type", columns="Deal Readiness", aggfunc="size", fill_value=0, observed=True)
         st.dataframe(matrix.style.background_gradient(cmap="Blues"), use_container_width=True)
 
 # --- Tab 9: Compare Segments ---
-with tabs[9]:
+# Fragment panel: its widgets rerun only this tab (see shared.tabs)
+@st.fragment
+@span("compare segments")
+def compare_segments(df):
     st.subheader("⚖️ Compare Segments")
     if "Sector" in df.columns:
         col_type = st.selectbox("Select Field to Compare", ["Sector", "Business Model", "Deal Type", "Assigned Analyst"])
@@ -143,4 +168,10 @@ with tabs[9]:
                 avg_df = comp_df.groupby(col_type)["EBITDA Margin"].mean().reset_index()
                 st.plotly_chart(px.bar(avg_df, x=col_type, y="EBITDA Margin", color=col_type), use_container_width=True)
 
-            st.dataframe(comp_df[[col_type, "Target Company Name"] + [col for col in comp_df.columns if col not in [col_type, "Target Company Name"]]], use_container_width=True)
\ No newline at end of file
+            st.dataframe(comp_df[[col_type, "Target Company Name"] + [col for col in comp_df.columns if col not in [col_type, "Target Company Name"]]], use_container_width=True)
+
+with tabs[9], span("tab compare segments"):
+    compare_segments(df)
+
+# --- Performance (opt-in sidebar panel) ---
+performance_panel()
@@ -1,13 +1,22 @@
 
 
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+import sys
+from pathlib import Path
+
+REPO_ROOT = str(Path(__file__).resolve().parent.parent)
+if REPO_ROOT not in sys.path:  # the script reruns on every interaction
+    sys.path.insert(0, REPO_ROOT)
+from shared.export import download_button
+from shared.filters import filter_index
+from shared.grid import paged_grid
+from shared.loader import dataset_version
+from shared.profiling import performance_panel, span, start_profiling
 
 # --- Page Config ---
 st.set_page_config(page_title="Vendor Dashboard", layout="wide")
-
-from pathlib import Path
+start_profiling()
 
 def load_css(filename):
     css_path = Path(__file__).parent / filename
@@ -20,19 +29,10 @@ load_css("style.css")
 st.markdown('<div class="navbar">📦 Vendor Management Dashboard</div>', unsafe_allow_html=True)
 
 # --- Load and Clean Data ---
-from pathlib import Path
-excel_path = Path(__file__).parent / "vs.xlsx"
-df = pd.read_excel(excel_path)
-
-df = df.dropna(how='all')
-
-# Clean numeric columns
-numeric_cols = [
-    "Total PO Value (₹)", "Avg Rating (1–5)", "On-Time Delivery (%)",
-    "Defect Rate (%)", "Pending Payments (₹)", "SLA Breaches", "Complaints Count"
-]
-for col in numeric_cols:
-    df[col] = pd.to_numeric(df[col], errors='coerce')
+# Numeric columns are coerced at load by shared.datasets; filter bitmaps are
+# built once per data version by shared.filters
+index = filter_index("vendor", ["Category", "Location", "ISO Certified", "Status"])
+df = index.frame.copy(deep=False)  # the index holds the shared cached frame
 
 # --- Sidebar Filters ---
 st.sidebar.header("🔍 Filter Vendors")
@@ -42,40 +42,34 @@ select_all = st.sidebar.checkbox("✅ Select All Filters", value=True)
 
 # Individual filters, obey master toggle
 categories = st.sidebar.multiselect(
-    "Category", sorted(df["Category"].dropna().unique()),
-    default=sorted(df["Category"].dropna().unique()) if select_all else []
+    "Category", index.options["Category"],
+    default=index.options["Category"] if select_all else []
 )
 
 locations = st.sidebar.multiselect(
-    "Location", sorted(df["Location"].dropna().unique()),
-    default=sorted(df["Location"].dropna().unique()) if select_all else []
+    "Location", index.options["Location"],
+    default=index.options["Location"] if select_all else []
 )
 
 iso_certified = st.sidebar.multiselect(
-    "ISO Certified", sorted(df["ISO Certified"].dropna().unique()),
-    default=sorted(df["ISO Certified"].dropna().unique()) if select_all else []
+    "ISO Certified", index.options["ISO Certified"],
+    default=index.options["ISO Certified"] if select_all else []
 )
 
 status_filter = st.sidebar.multiselect(
-    "Status", sorted(df["Status"].dropna().unique()),
-    default=sorted(df["Status"].dropna().unique()) if select_all else []
+    "Status", index.options["Status"],
+    default=index.options["Status"] if select_all else []
 )
 
 # ✅ Apply Filters
-df = df[
-    df["Category"].isin(categories) &
-    df["Location"].isin(locations) &
-    df["ISO Certified"].isin(iso_certified) &
-    df["Status"].isin(status_filter)
-]
-
-# Apply filters
-df = df[
-    df["Category"].isin(categories) &
-    df["Location"].isin(locations) &
-    df["ISO Certified"].isin(iso_certified) &
-    df["Status"].isin(status_filter)
-]
+selections = {
+    "Category": categories,
+    "Location": locations,
+    "ISO Certified": iso_certified,
+    "Status": status_filter,
+}
+df = index.select(selections)
+view_state = (dataset_version("vendor"), selections)
 
 # --- Layout Tabs ---
 tabs = st.tabs([
@@ -84,7 +78,7 @@ tabs = st.tabs([
 ])
 
 # --- Tab 0: Overview ---
-with tabs[0]:
+with tabs[0], span("tab overview"):
     st.markdown("## 📊 Key Performance Indicators")
 
     col1, col2, col3 = st.columns(3)
@@ -118,7 +112,7 @@ with tabs[0]:
     st.plotly_chart(fig_status, use_container_width=True)
 
 # --- Tab 1: Visual Insights ---
-with tabs[1]:
+with tabs[1], span("tab visual insights"):
     st.subheader("📈 Visual Insights")
     c1, c2 = st.columns(2)
 
@@ -137,18 +131,15 @@ with tabs[1]:
     st.plotly_chart(fig3, use_container_width=True)
 
 # --- Tab 2: Vendor Table ---
-with tabs[2]:
+with tabs[2], span("tab vendor table"):
     st.subheader("📋 Vendor Table")
-    st.dataframe(df, use_container_width=True)
-    st.download_button("⬇️ Download Filtered Data", df.to_csv(index=False), "Filtered_Vendors.csv")
+    paged_grid(df, key="vendor_table", state=view_state)
+    download_button("⬇️ Download Filtered Data", df, "Filtered_Vendors", state=view_state, key="vendor_download")
 
 # --- Tab 3: Payment Overview ---
-with tabs[3]:
+with tabs[3], span("tab payment overview"):
     st.subheader("🧾 Payment Overview")
 
-    df["Pending Payments (₹)"] = pd.to_numeric(df["Pending Payments (₹)"], errors="coerce")
-    df["Total PO Value (₹)"] = pd.to_numeric(df["Total PO Value (₹)"], errors="coerce")
-
     st.metric("💸 Total Pending Payments (₹)", f"{df['Pending Payments (₹)'].sum():,.0f}")
 
     st.markdown("### 📊 Pending Payments vs PO Value (Top 10 Vendors)")
@@ -176,7 +167,7 @@ with tabs[3]:
     st.plotly_chart(fig_avg, use_container_width=True)
 
 # --- Tab 4: Performance Metrics ---
-with tabs[4]:
+with tabs[4], span("tab performance metrics"):
     st.subheader("⚙️ Performance Metrics")
 
     fig_sla = px.scatter(df, x="SLA Breaches", y="Avg Rating (1–5)", size="Complaints Count",
@@ -191,7 +182,10 @@ with tabs[4]:
     st.plotly_chart(fig_ontime, use_container_width=True)
 
 # --- Tab 5: Category Drilldown ---
-with tabs[5]:
+# Fragment panel: its widgets rerun only this tab (see shared.tabs)
+@st.fragment
+@span("category drilldown")
+def category_drilldown(df, state):
     st.subheader("🗂 Category Drilldown")
     selected_cat = st.selectbox("Choose a Category", sorted(df["Category"].dropna().unique()))
 
@@ -199,4 +193,11 @@ with tabs[5]:
     st.markdown(f"### Showing {len(cat_df)} vendors in **{selected_cat}** category")
 
     st.dataframe(cat_df, use_container_width=True)
-    st.download_button("⬇️ Download Category Data", cat_df.to_csv(index=False), f"{selected_cat}_vendors.csv")
+    download_button("⬇️ Download Category Data", cat_df, f"{selected_cat}_vendors",
+                    state=(state, selected_cat), key="category_download")
+
+with tabs[5], span("tab category drilldown"):
+    category_drilldown(df, view_state)
+
+# --- Performance (opt-in sidebar panel) ---
+performance_panel()
@@ -0,0 +1,9 @@
+"""Helpers shared by all Opulence dashboards.
+
+Each dashboard is launched with ``streamlit run <Folder>/<app>.py`` and adds
+the repository root to ``sys.path`` so it can import this package.
+"""
+from shared.datasets import DATASETS, Dataset
+from shared.loader import clear_cache, load_dataset
+
+__all__ = ["DATASETS", "Dataset", "clear_cache", "load_dataset"]
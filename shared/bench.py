@@ -0,0 +1,207 @@
+"""Headless benchmark of every dashboard script at several data sizes.
+
+Usage (from the repository root)::
+
+    python -m shared.bench                           # all apps at 1k, 100k, 1M rows
+    python -m shared.bench --rows 1k 100k --apps BuySide/BSapp.py
+    python -m shared.bench --output bench.json
+
+For each row count ``shared.synth`` generates that many rows of every
+registered dataset as Arrow snapshots in a scratch directory, which the apps
+read through ``$DASHBOARD_DATA_DIR``. Each app then runs in a fresh process under
+Streamlit's ``AppTest`` and reports, as JSON:
+
+- ``cold_start_s``: the first run, including loading the data;
+- ``rerun_s``: median and max of plain reruns with nothing changed;
+- ``interactions_s``: one timed rerun per interaction (sidebar filter
+  toggles, tab switches, compare selectboxes);
+- ``peak_rss_mb``: the worker process's peak resident set size.
+
+A run that raises or times out is reported with an ``error`` instead.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from shared.datasets import DATASETS, ROOT
+
+APPS = [
+    "BuySide/BSapp.py", "SellSide/ssapp.py", "ExsistingDeal/EDapp.py", "NewDeal/NDapp.py",
+    "FinModelling/FinMod.py", "VendorSide/vsapp.py", "InvestorDashboards/app2.py",
+    "PitchQuality/pitchapp.py", "HR Dashboard/OIntern.py",
+]
+DEFAULT_ROWS = ["1k", "100k", "1M"]
+
+
+def parse_rows(text):
+    """``"100k"`` -> 100000, ``"1M"`` -> 1000000."""
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1].lower(), 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+def write_scaled_data(directory, rows):
+    """Write every dataset, generated at ``rows`` rows, as snapshots under ``directory``."""
+    from shared.synth import write_dataset
+
+    for dataset in DATASETS.values():
+        write_dataset(dataset, directory, rows)
+
+
+# --- Interactions (run inside the worker) ---
+
+def _widget(elements, label):
+    return next((element for element in elements if element.label == label), None)
+
+
+def _toggle_first_filter(at):
+    if not at.sidebar.checkbox:
+        return None
+    checkbox = at.sidebar.checkbox[0]
+    return checkbox.set_value(not checkbox.value)
+
+
+def _narrow_first_multiselect(at):
+    multiselect = next((m for m in at.sidebar.multiselect if m.options), None)
+    return None if multiselect is None else multiselect.set_value([multiselect.options[0]])
+
+
+def _open_tab(label_part):
+    def interact(at):
+        labels = [tab.label for tab in at.tabs]
+        label = next((label for label in labels if label_part in label), None)
+        if label is None or "tabs" not in at.session_state:
+            return None
+        at.session_state["tabs"] = label
+        return at
+    return interact
+
+
+def _pick_last(label, sidebar=False):
+    def interact(at):
+        selectbox = _widget((at.sidebar if sidebar else at).selectbox, label)
+        if selectbox is None or not selectbox.options:
+            return None
+        return selectbox.set_value(selectbox.options[-1])
+    return interact
+
+
+COMMON = [("filter_toggle", _toggle_first_filter), ("filter_select", _narrow_first_multiselect)]
+INTERACTIONS = {
+    "BuySide/BSapp.py": [("compare_segment", _pick_last("Segment B"))],
+    "SellSide/ssapp.py": [("compare_segment", _pick_last("Second Segment"))],
+    "ExsistingDeal/EDapp.py": [("tab_switch", _open_tab("Full Data"))],
+    "NewDeal/NDapp.py": [("tab_switch", _open_tab("Raw Data"))],
+    "FinModelling/FinMod.py": [("tab_switch", _open_tab("KPI Comparison")),
+                               ("compare_analyst", _pick_last("Select Analyst B"))],
+    "VendorSide/vsapp.py": [("compare_category", _pick_last("Choose a Category"))],
+    "InvestorDashboards/app2.py": [("tab_switch", _open_tab("Contact Sheet"))],
+    "PitchQuality/pitchapp.py": [("select_intern", _pick_last("Select Intern", sidebar=True))],
+    "HR Dashboard/OIntern.py": [("select_intern", _pick_last("Select Intern:"))],
+}
+
+
+def _timed_run(at):
+    start = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return elapsed
+
+
+def run_worker(app, reruns, timeout):
+    """Benchmark ``app`` in this process and return the result record."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(ROOT / app), default_timeout=timeout)
+    result = {"cold_start_s": _timed_run(at)}
+    times = [_timed_run(at) for _ in range(reruns)]
+    result["rerun_s"] = {"median": statistics.median(times), "max": max(times)}
+    result["interactions_s"] = {}
+    for name, interact in COMMON + INTERACTIONS.get(app, []):
+        if interact(at) is not None:
+            result["interactions_s"][name] = _timed_run(at)
+    return result
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def benchmark(app, rows, data_dir, reruns, timeout):
+    """Run ``app`` against ``data_dir`` in a fresh process; return its record."""
+    record = {"app": app, "rows": rows}
+    env = dict(os.environ, DASHBOARD_DATA_DIR=str(data_dir))
+    command = [sys.executable, "-m", "shared.bench", "--worker", app,
+               "--reruns", str(reruns), "--timeout", str(timeout)]
+    try:
+        # Every rerun and interaction may use the full per-run timeout
+        budget = timeout * (reruns + 2 + len(COMMON) + len(INTERACTIONS.get(app, [])))
+        done = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True,
+                              timeout=budget)
+    except subprocess.TimeoutExpired:
+        record["error"] = "timed out"
+        return record
+    lines = done.stdout.strip().splitlines()
+    if done.returncode != 0 or not lines:
+        record["error"] = (done.stderr.strip().splitlines() or ["worker failed"])[-1]
+        return record
+    record.update(json.loads(lines[-1]))
+    return record
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", nargs="*", default=DEFAULT_ROWS, help="row counts, e.g. 1k 100k 1M")
+    parser.add_argument("--apps", nargs="*", default=APPS, help="app scripts relative to the repository")
+    parser.add_argument("--reruns", type=int, default=5, help="plain reruns to time per app")
+    parser.add_argument("--timeout", type=float, default=600, help="seconds allowed per script run")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        try:
+            result = run_worker(args.worker, args.reruns, args.timeout)
+        except Exception as exc:
+            result = {"error": f"{type(exc).__name__}: {exc}"}
+        result["peak_rss_mb"] = _peak_rss_mb()
+        print(json.dumps(result))
+        return
+
+    unknown = set(args.apps) - set(APPS)
+    if unknown:
+        parser.error(f"unknown app(s): {', '.join(sorted(unknown))}")
+
+    results = []
+    for rows in map(parse_rows, args.rows):
+        with tempfile.TemporaryDirectory(prefix="dashboard-bench-") as data_dir:
+            print(f"generating {rows:,} rows per dataset", file=sys.stderr)
+            write_scaled_data(data_dir, rows)
+            for app in args.apps:
+                print(f"  {app}", file=sys.stderr)
+                results.append(benchmark(app, rows, data_dir, args.reruns, args.timeout))
+
+    report = json.dumps({
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }, indent=2)
+    if args.output:
+        Path(args.output).write_text(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Count cube over a dataset's filter dimensions.
+
+Dashboards with many tabs group the filtered rows by one or two dimensions
+per chart, so every rerun re-aggregates the raw frame a dozen times.
+``CountCube`` aggregates the rows once per data version into the distinct
+combinations of all dimension codes with their row counts. A dense cube over
+nine dimensions would be enormous, but the sparse one has at most one entry
+per row and usually far fewer. A chart's counts under the current filter are
+then a mask plus a weighted ``bincount`` over that small table.
+"""
+import numpy as np
+import pandas as pd
+
+from shared.loader import derive
+
+
+class CountCube:
+    def __init__(self, frame, dimensions):
+        self.dimensions = [dim for dim in dimensions if dim in frame.columns]
+        self.categories = {}
+        columns = []
+        for dim in self.dimensions:
+            values = frame[dim].astype("category").cat
+            self.categories[dim] = values.categories
+            columns.append(values.codes.to_numpy())
+        codes = np.column_stack(columns) if columns else np.empty((len(frame), 0), np.int8)
+        # Rows with a blank dimension never pass the sidebar filters
+        codes = codes[(codes >= 0).all(axis=1)]
+        self._codes, self._counts = np.unique(codes, axis=0, return_counts=True)
+
+    def _keep(self, selections):
+        keep = np.ones(len(self._codes), dtype=bool)
+        for i, dim in enumerate(self.dimensions):
+            if dim not in selections:
+                continue
+            categories = self.categories[dim]
+            selected = categories.get_indexer(pd.Index(list(selections[dim])).unique())
+            selected = selected[selected >= 0]
+            if len(selected) == len(categories):
+                continue
+            lookup = np.zeros(len(categories), dtype=bool)
+            lookup[selected] = True
+            keep &= lookup[self._codes[:, i]]
+        return keep
+
+    def total(self, selections):
+        """Number of rows matching ``selections``."""
+        return int(self._counts[self._keep(selections)].sum())
+
+    def counts(self, selections, by):
+        """Row counts per combination of the ``by`` dimensions under ``selections``.
+
+        Returns a frame with one column per ``by`` dimension plus ``Count``,
+        holding only the combinations that occur, in category order.
+        """
+        keep = self._keep(selections)
+        positions = [self.dimensions.index(dim) for dim in by]
+        sizes = [len(self.categories[dim]) for dim in by]
+        flat = np.ravel_multi_index(tuple(self._codes[keep][:, i] for i in positions), sizes)
+        cells, inverse = np.unique(flat, return_inverse=True)
+        totals = np.bincount(inverse, weights=self._counts[keep], minlength=len(cells))
+        parts = np.unravel_index(cells, sizes)
+        result = pd.DataFrame({dim: self.categories[dim].take(part) for dim, part in zip(by, parts)})
+        result["Count"] = totals.astype(np.int64)
+        return result
+
+
+def count_cube(name, dimensions):
+    """Return the ``CountCube`` of dataset ``name`` for its current version."""
+    dimensions = tuple(dimensions)
+    return derive(name, ("count_cube", dimensions), lambda frame: CountCube(frame, dimensions))
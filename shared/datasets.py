@@ -0,0 +1,183 @@
+"""Registry of the workbooks behind each dashboard.
+
+A ``Dataset`` records where a workbook lives and how its sheet is turned into
+the frame the dashboard works with (header layout, dropped helper columns,
+blank-row rules, column types, derived metrics). The loader, the snapshot compiler and the
+ingest tools all read workbooks through this registry so they produce
+identical frames.
+
+Workbook paths are relative to the repository root, or to
+``$DASHBOARD_DATA_DIR`` when set (e.g. a directory of generated benchmark
+data laid out like the repository).
+"""
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+from shared.metrics import Bands, Ratio, apply_metrics
+from shared.schema import Schema
+
+ROOT = Path(__file__).resolve().parent.parent
+DATA_ROOT = Path(os.environ.get("DASHBOARD_DATA_DIR", ROOT))
+
+
+@dataclass(frozen=True)
+class Dataset:
+    name: str
+    path: str
+    sheet_name: object = 0
+    skiprows: int = None
+    columns: tuple = None
+    drop: tuple = ()
+    required: tuple = ()
+    schema: Schema = Schema()
+    metrics: tuple = ()
+
+    @property
+    def source(self):
+        return DATA_ROOT / self.path
+
+    @property
+    def snapshot(self):
+        return self.source.with_suffix(".arrow")
+
+    def read_kwargs(self):
+        kwargs = {"sheet_name": self.sheet_name}
+        if self.skiprows is not None:
+            kwargs["skiprows"] = self.skiprows
+        return kwargs
+
+    def prepare(self, df):
+        """Turn the raw sheet into the dashboard frame."""
+        return self.finish(self.trim(df))
+
+    def trim(self, df):
+        """Name the columns, drop helper columns and blank or incomplete rows.
+
+        Unlike ``finish`` this works row by row, so a sheet can be trimmed in chunks.
+        """
+        if self.columns is not None:
+            df.columns = list(self.columns)
+        else:
+            df.columns = df.columns.str.strip()
+        df = df.drop(columns=list(self.drop))
+        df = df.dropna(how="all")
+        if self.required:
+            df = df.dropna(subset=list(self.required))
+        return df
+
+    def finish(self, df):
+        """Apply the column types, then compute the derived metrics."""
+        return apply_metrics(self.schema.apply(df), self.metrics)
+
+
+DATASETS = {
+    d.name: d
+    for d in [
+        Dataset(
+            "buyside", "BuySide/BuySide.xlsx",
+            schema=Schema(
+                numeric=("Fund Size (INR Cr)", "Engagement Level (1 to 5)"),
+                datetime=("Engagement Start Date",),
+                categorical=(
+                    "Sector of Interest", "Geography Preference", "Investment Type",
+                    "Deal Structure Preference", "Client Type", "Investment Horizon",
+                    "ESG Mandate", "Board Representation Required", "Risk Appetite",
+                    "Decision Making Speed",
+                ),
+            ),
+        ),
+        Dataset(
+            "sellside", "SellSide/SellSide.xlsx",
+            schema=Schema(
+                numeric=("EBITDA Margin", "Deal Readiness"),
+                datetime=("Last Updated",),
+                categorical=(
+                    "Sector", "Sub-Sector", "Business Model", "Location", "Deal Type",
+                    "Investor Fit", "Status", "Assigned Analyst",
+                ),
+            ),
+        ),
+        Dataset(
+            "existing_deal", "ExsistingDeal/EDeal.xlsx",
+            schema=Schema(
+                numeric=("MATCH_SCORE", "DEAL_VALUE_ESTIMATE", "Actual Value"),
+                datetime=("DATE",),
+                categorical=(
+                    "ANALYST", "DEAL_PRIORITY", "STATUS", "COMPANY_SECTOR", "INVESTOR_TYPE",
+                    "DUE_DILIGENCE_STATUS", "DEAL_STAGE",
+                ),
+            ),
+        ),
+        Dataset(
+            "new_deal", "NewDeal/ND.xlsx",
+            schema=Schema(
+                numeric=("Deal Size (₹ Cr)", "Investor Outreach Count", "Warm Investor Leads",
+                         "Quality Rating"),
+                datetime=("Contact Date",),
+                categorical=(
+                    "Intern Name", "Lead Source", "Sector", "Mapping Status", "Meeting Scheduled",
+                    "Deal Stage", "Closure Status", "Term Sheet Status",
+                ),
+            ),
+        ),
+        Dataset(
+            "finmod", "FinModelling/FinM.xlsx", sheet_name="Sheet1",
+            schema=Schema(
+                numeric=("Actual Value",),
+                datetime=("Period",),
+                categorical=("KRA", "Analyst", "Activity Name", "Frequency", "Status"),
+            ),
+        ),
+        Dataset(
+            "vendor", "VendorSide/vs.xlsx",
+            schema=Schema(
+                numeric=(
+                    "Total PO Value (₹)", "Avg Rating (1–5)", "On-Time Delivery (%)",
+                    "Defect Rate (%)", "Pending Payments (₹)", "SLA Breaches", "Complaints Count",
+                ),
+                categorical=("Category", "Location", "ISO Certified", "Status"),
+            ),
+        ),
+        Dataset(
+            "investor", "InvestorDashboards/InvetorDashboard.xlsx",
+            schema=Schema(
+                categorical=(
+                    "Point of Contact", "Designation", "Sector Interest", "Ticket Size",
+                    "Investment Stage", "Source of Capital", "Investment Strategy", "Geography",
+                    "Market Type",
+                ),
+            ),
+        ),
+        Dataset(
+            "pitch", "PitchQuality/Pitch_Quality_Commitee.xlsx",
+            schema=Schema(
+                numeric=("Total pitches", "Total Reply Recived", "Total Score"),
+                datetime=("Last Updated",),
+                categorical=("Industry Sector", "Grade", "Evaluation Status"),
+            ),
+            metrics=(Ratio("Reply Rate", "Total Reply Recived", "Total pitches", scale=100),),
+        ),
+        Dataset(
+            "interns", "HR Dashboard/OEmployees.xlsx", sheet_name="Sheet2", skiprows=2,
+            columns=(
+                "Index", "Sno", "Student Name", "Collage Name", "Phone No.", "Email ID",
+                "Specialisation", "WHO/WFH", "Days Worked", "Allocated Sector",
+                "New Deals Assigned", "Existing Deals Worked", "Priority of Deal",
+                "Attendance Days", "Absences", "Performance Score",
+                "Stakeholder Feedback", "Intern Remarks", "Number",
+            ),
+            drop=("Index", "Number"),
+            required=("Student Name",),
+            schema=Schema(
+                numeric=("Days Worked", "Attendance Days", "Absences", "Performance Score"),
+                categorical=("Specialisation", "WHO/WFH", "Allocated Sector"),
+            ),
+            metrics=(
+                Bands("Performance Segment", "Performance Score", edges=(5, 8),
+                      labels=("Low", "Medium", "High")),
+                Ratio("Consistency Score", ("Days Worked", "Absences"), "Days Worked", decimals=2),
+            ),
+        ),
+    ]
+}
@@ -0,0 +1,120 @@
+"""Streaming, chunked workbook ingest with bounded memory.
+
+``pd.read_excel`` collects every cell of a sheet as a Python object before it
+builds a frame, so parsing a workbook needs several times its size in
+memory, and the peak grows with the sheet. ``read_dataset`` walks the sheet
+with openpyxl's read-only row iterator instead, ``CHUNK_ROWS`` rows at a time.
+Each chunk is parsed into a small frame, trimmed by the dataset (column
+names, dropped columns, blank and incomplete rows) and its numeric and date
+columns typed; only those column buffers are kept. The chunk's Python
+objects are released before the next one is read, so beyond the result the
+peak is one chunk however large the sheet.
+
+The frame matches ``dataset.prepare(pd.read_excel(...))``, including the row
+labels of the original sheet: cells are converted the way pandas' openpyxl
+reader converts them and each chunk goes through the same ``TextParser``.
+
+Usage::
+
+    df = read_dataset(DATASETS["interns"])   # Sheet2, two title rows skipped
+"""
+import math
+from datetime import datetime
+from itertools import islice
+
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+from shared.imports import lazy_module
+
+openpyxl = lazy_module("openpyxl")
+
+CHUNK_ROWS = 5_000
+
+# Values openpyxl gives error cells; pandas reads them as NaN
+_ERRORS = {"#NULL!", "#DIV/0!", "#VALUE!", "#REF!", "#NAME?", "#NUM!", "#N/A"}
+
+
+def _convert_cell(value):
+    # As pandas' openpyxl reader: blanks are "", error cells NaN, whole floats ints
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else value
+    if isinstance(value, str) and value.startswith("#") and value in _ERRORS:
+        return math.nan
+    return value
+
+
+def _trimmed(row):
+    """``row`` converted, without its trailing blank cells."""
+    row = [_convert_cell(value) for value in row]
+    while row and row[-1] == "":
+        row.pop()
+    return row
+
+
+def _open_sheet(path, sheet_name):
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True, keep_links=False)
+    sheet = workbook.worksheets[sheet_name] if isinstance(sheet_name, int) else workbook[sheet_name]
+    # Read-only sheets trust the dimensions stored in the file, which are often stale
+    sheet.reset_dimensions()
+    return workbook, sheet
+
+
+def iter_chunks(path, sheet_name=0, skiprows=None, chunk_rows=CHUNK_ROWS):
+    """Yield the sheet as frames of up to ``chunk_rows`` rows, labelled by row position.
+
+    ``skiprows`` rows are skipped before the header row. Concatenated, the
+    chunks hold what ``pd.read_excel`` returns for the same arguments, up to
+    trailing blank rows and the dtype of columns blank in a whole chunk.
+    """
+    workbook, sheet = _open_sheet(path, sheet_name)
+    try:
+        rows = sheet.iter_rows(values_only=True)
+        for _ in islice(rows, skiprows or 0):
+            pass
+        header = _trimmed(next(rows, ()))
+        start = 0
+        while True:
+            chunk = [_trimmed(row) for row in islice(rows, chunk_rows)]
+            if not chunk:
+                break
+            # Cells past the header get "Unnamed: i" columns, as in pandas
+            width = max(len(header), *map(len, chunk))
+            header += [""] * (width - len(header))
+            frame = TextParser([header, *(row + [""] * (width - len(row)) for row in chunk)],
+                               header=0, skip_blank_lines=False).read()
+            frame.index = pd.RangeIndex(start, start + len(chunk))
+            start += len(chunk)
+            yield frame
+    finally:
+        workbook.close()
+
+
+def _type_chunk(dataset, frame):
+    # Numbers and dates become flat arrays now; categories are built once by finish
+    schema = dataset.schema
+    for col in schema.numeric:
+        if col in frame.columns:
+            frame[col] = pd.to_numeric(frame[col], errors="coerce")
+    for col in schema.datetime:
+        if col in frame.columns and frame[col].map(
+                lambda value: isinstance(value, datetime) or pd.isna(value)).all():
+            frame[col] = pd.to_datetime(frame[col])
+    return frame
+
+
+def read_dataset(dataset, chunk_rows=CHUNK_ROWS):
+    """Read and prepare ``dataset`` from its workbook one chunk of rows at a time."""
+    chunks = [
+        _type_chunk(dataset, dataset.trim(frame))
+        for frame in iter_chunks(dataset.source, dataset.sheet_name, dataset.skiprows, chunk_rows)
+    ]
+    if not chunks:
+        return dataset.prepare(pd.read_excel(dataset.source, **dataset.read_kwargs()))
+    df = pd.concat(chunks) if len(chunks) > 1 else chunks[0]
+    # A column blank throughout one chunk comes back as floats there; re-infer
+    # the columns the concatenation left as objects
+    df = df.infer_objects()
+    return dataset.finish(df)
@@ -0,0 +1,113 @@
+"""On-demand, cached downloads of filtered frames.
+
+``st.download_button(..., df.to_csv(index=False))`` serialises the whole
+filtered frame on every rerun, whether or not anyone downloads it.
+``download_button`` instead hands Streamlit a callable, so the file is only
+built when the button is clicked. The result is cached under a hash of the
+filter state, and repeated clicks with unchanged filters are free. Files are
+written in row chunks so large frames never need a second full-size text copy.
+
+Usage::
+
+    download_button("⬇️ Download Filtered Data", df, "Filtered_KPIs",
+                    state=view_state, key="raw_download")
+"""
+import importlib.util
+import io
+
+import streamlit as st
+
+from shared.imports import lazy_module
+from shared.loader import LRUCache, state_hash
+from shared.profiling import span
+from shared.schema import arrow_safe
+
+# The writers' libraries are imported by the first export that needs them
+openpyxl = lazy_module("openpyxl")
+pa = lazy_module("pyarrow")
+parquet = lazy_module("pyarrow.parquet")
+
+CHUNK_ROWS = 50_000
+MAX_ENTRIES = 16
+
+_exports = LRUCache(MAX_ENTRIES)
+
+
+def _chunks(df):
+    for start in range(0, len(df), CHUNK_ROWS):
+        yield start, df.iloc[start:start + CHUNK_ROWS]
+
+
+def _write_csv(df, out):
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="")
+    if df.empty:
+        df.to_csv(text, index=False)
+    for start, chunk in _chunks(df):
+        chunk.to_csv(text, index=False, header=start == 0)
+    text.flush()
+    text.detach()
+
+
+def _write_parquet(df, out):
+    df = arrow_safe(df)
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with parquet.ParquetWriter(out, schema) as writer:
+        for _, chunk in _chunks(df):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def write_xlsx(df, out, sheet_name="Data", skiprows=0):
+    """Write ``df`` as one sheet, header first, after ``skiprows`` blank rows."""
+    # Write-only workbooks stream rows to disk instead of building cell objects
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    for _ in range(skiprows):
+        sheet.append([])
+    sheet.append([str(col) for col in df.columns])
+    for _, chunk in _chunks(df):
+        values = chunk.astype(object).where(chunk.notna(), None)
+        for row in values.itertuples(index=False):
+            sheet.append(list(row))
+    workbook.save(out)
+
+
+FORMATS = {
+    "CSV": ("csv", "text/csv", _write_csv),
+    "XLSX": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", write_xlsx),
+}
+# Parquet export is offered only with pyarrow installed
+if importlib.util.find_spec("pyarrow") is not None:
+    FORMATS["Parquet"] = ("parquet", "application/vnd.apache.parquet", _write_parquet)
+
+
+def export_bytes(df, fmt, state=None):
+    """Serialise ``df`` to ``fmt``, reusing the cached file for the same ``state``.
+
+    ``state`` must capture everything ``df`` depends on (data version, filter
+    selections); without it the file is built fresh and not cached.
+    """
+    @span(f"export {fmt}")
+    def build():
+        out = io.BytesIO()
+        FORMATS[fmt][2](df, out)
+        return out.getvalue()
+
+    if state is None:
+        return build()
+    return _exports.get((state_hash(state), fmt), build)
+
+
+def download_button(label, df, file_name, state=None, key="download"):
+    """Format picker plus a download button that builds the file on click.
+
+    ``file_name`` is the name without extension; the picked format adds it.
+    """
+    fmt = st.segmented_control(
+        "Format", list(FORMATS), default="CSV", required=True,
+        key=f"{key}_format", label_visibility="collapsed",
+    )
+    extension, mime, _ = FORMATS[fmt]
+    return st.download_button(
+        label, lambda: export_bytes(df, fmt, state), file_name=f"{file_name}.{extension}",
+        mime=mime, key=key, on_click="ignore",
+    )
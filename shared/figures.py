@@ -0,0 +1,64 @@
+"""Cached PNG rendering of matplotlib figures.
+
+``st.pyplot(fig)`` rasterises the figure on every rerun, and figures created
+through ``plt.subplots`` stay registered with pyplot until closed, so a
+long-running server accumulates every chart it ever drew. ``cached_figure``
+runs a drawing function, rasterises its figure, closes it straight away and
+keeps the PNG under ``(chart id, state)``. Repeat views with the same data and
+filters are served from the PNG without touching matplotlib or seaborn.
+
+Usage::
+
+    @cached_figure(state=view_state)
+    def work_mode_pie():
+        fig, ax = plt.subplots()
+        ...
+        return fig
+"""
+import io
+import threading
+
+import streamlit as st
+
+from shared.imports import lazy_module
+from shared.loader import LRUCache, state_hash
+from shared.profiling import span
+
+MAX_ENTRIES = 256
+# Same output as st.pyplot
+SAVEFIG_OPTIONS = {"format": "png", "bbox_inches": "tight", "dpi": 200}
+
+# pyplot is imported by the first render, not when a dashboard starts
+plt = lazy_module("matplotlib.pyplot")
+_renders = LRUCache(MAX_ENTRIES)
+# pyplot keeps global state (current figure, tight_layout); draw one at a time
+_pyplot_lock = threading.Lock()
+
+
+def render_png(draw):
+    """Call ``draw()``, rasterise the figure it returns and close it."""
+    with _pyplot_lock:
+        with span("draw"):
+            fig = draw()
+        try:
+            out = io.BytesIO()
+            with span("savefig"):
+                fig.savefig(out, **SAVEFIG_OPTIONS)
+        finally:
+            plt.close(fig)
+    return out.getvalue()
+
+
+def cached_figure(state, chart_id=None):
+    """Decorator that shows the figure drawn by the function, cached by ``state``.
+
+    ``state`` must capture everything the figure depends on (data version,
+    filters, selected values). ``chart_id`` defaults to the function name.
+    The function runs immediately; the decorated name refers to it unchanged.
+    """
+    def show(draw):
+        key = (chart_id or draw.__qualname__, state_hash(state))
+        with span(f"figure {key[0]}"):
+            st.image(_renders.get(key, lambda: render_png(draw)), width="stretch")
+        return draw
+    return show
@@ -0,0 +1,217 @@
+"""Bitmap index for the sidebar filters.
+
+The dashboards used to narrow ``df`` one filter column at a time, copying the
+frame at every step and re-sorting each option list on every rerun.
+``FilterIndex`` precomputes, once per data version, a packed bitmap of the
+matching rows for every value of every filter column. A selection ANDs the
+bitmaps of the constrained columns into one row mask and takes the rows once.
+
+The same bitmaps and category codes give faceted counts: how many rows each
+sidebar option would match under the other active filters. ``FacetCounter``
+keeps a session's counts and recomputes only the facets whose inputs changed.
+
+``RowView`` is a filtered view for sessions: the shared, never-modified frame
+of the loader plus an array of row positions. Narrowing a view only shrinks
+that array. A chart takes just the columns it plots through ``project``, so a
+session holds its selected rows of a few columns and never a copy of the
+dataset. Derived columns go on the projection.
+"""
+import numpy as np
+import pandas as pd
+
+from shared.loader import derive
+from shared.profiling import span
+from shared.schema import compact_categories
+
+
+class FilterIndex:
+    def __init__(self, frame, columns):
+        self.frame = frame
+        self.columns = [col for col in columns if col in frame.columns]
+        self.options = {}
+        self._categories = {}
+        self._codes = {}
+        self._bitmaps = {}
+        self._rows = len(frame)
+
+        # Like the ``isin`` chains this replaces, rows with a blank filter
+        # value never match, even when every option is selected
+        notna = np.ones(self._rows, dtype=bool)
+        for col in self.columns:
+            values = frame[col].astype("category").cat
+            codes = values.codes.to_numpy()
+            bitmaps = np.zeros((len(values.categories), (self._rows + 7) // 8), dtype=np.uint8)
+            for code in range(len(values.categories)):
+                bitmaps[code] = np.packbits(codes == code)
+            self._bitmaps[col] = bitmaps
+            self._codes[col] = codes
+            self._categories[col] = values.categories
+            self.options[col] = sorted(values.categories.tolist())
+            notna &= codes >= 0
+        self._notna = np.packbits(notna)
+
+    def selection_key(self, col, selected):
+        """Hashable form of a selection: sorted category codes, or None for all."""
+        categories = self._categories[col]
+        codes = np.unique(categories.get_indexer(pd.Index(list(selected)).unique()))
+        codes = codes[codes >= 0]
+        return None if len(codes) == len(categories) else tuple(codes.tolist())
+
+    def _column_bits(self, col, selected):
+        """Packed bitmap of rows whose ``col`` value is in ``selected``, or None for all."""
+        codes = self.selection_key(col, selected)
+        if codes is None:
+            return None
+        categories = self._categories[col]
+        bitmaps = self._bitmaps[col]
+        codes = np.asarray(codes, dtype=np.intp)
+        # OR together whichever side of the selection is smaller
+        if len(codes) <= len(categories) // 2:
+            return np.bitwise_or.reduce(bitmaps[codes], axis=0)
+        others = np.setdiff1d(np.arange(len(categories)), codes)
+        return ~np.bitwise_or.reduce(bitmaps[others], axis=0)
+
+    def mask(self, selections, extra=None):
+        """Boolean row mask for ``{column: selected values}``.
+
+        Columns missing from ``selections`` are unconstrained. ``extra`` is an
+        optional boolean array over ``frame`` ANDed in as well, for predicates
+        such as range sliders that are not value lists.
+        """
+        bits = self._base_bits(extra)
+        for column_bits in self._constraints(selections).values():
+            bits &= column_bits
+        return np.unpackbits(bits, count=self._rows).astype(bool)
+
+    def _base_bits(self, extra):
+        bits = self._notna.copy()
+        if extra is not None:
+            bits &= np.packbits(np.asarray(extra, dtype=bool))
+        return bits
+
+    def _constraints(self, selections):
+        """Packed bitmaps of the columns ``selections`` actually narrows."""
+        constraints = {}
+        for col, selected in selections.items():
+            if col in self._bitmaps:
+                column_bits = self._column_bits(col, selected)
+                if column_bits is not None:
+                    constraints[col] = column_bits
+        return constraints
+
+    def facet_counts(self, selections, columns=None, extra=None):
+        """Return ``{column: {option: rows}}`` for the facets in ``columns``.
+
+        Each option's count is the number of rows it would match under the
+        selections of every *other* column (plus ``extra``), which is what a
+        faceted sidebar shows next to the option. One ``bincount`` over the
+        precomputed category codes yields all the counts of a column.
+        """
+        constraints = self._constraints(selections)
+        base = self._base_bits(extra)
+        counts = {}
+        for col in self.columns if columns is None else columns:
+            bits = base.copy()
+            for other, column_bits in constraints.items():
+                if other != col:
+                    bits &= column_bits
+            rows = np.unpackbits(bits, count=self._rows).astype(bool)
+            categories = self._categories[col]
+            per_code = np.bincount(self._codes[col][rows], minlength=len(categories))
+            counts[col] = dict(zip(categories.tolist(), per_code.tolist()))
+        return counts
+
+    @span("filter")
+    def view(self, selections, extra=None):
+        """Return the ``RowView`` of the rows of ``frame`` matching ``selections``."""
+        return RowView(self.frame, np.flatnonzero(self.mask(selections, extra)))
+
+    @span("filter")
+    def select(self, selections, extra=None):
+        """Return the rows of ``frame`` matching ``selections`` in a single take."""
+        return self.view(selections, extra).project()
+
+
+class RowView:
+    """Rows of a shared frame by position; the frame itself is never copied or modified.
+
+    ``rows`` are positions into ``frame`` in ascending order (default: all).
+    Values of one column (``view[col]``) and boolean masks over the view are
+    aligned with ``rows``; ``where`` narrows the view to the rows a mask keeps.
+    """
+
+    def __init__(self, frame, rows=None):
+        self.frame = frame
+        self.rows = np.arange(len(frame)) if rows is None else np.asarray(rows, dtype=np.intp)
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def index(self):
+        """Labels of the view's rows in ``frame``."""
+        return self.frame.index[self.rows]
+
+    @property
+    def _everything(self):
+        return len(self.rows) == len(self.frame)
+
+    def __getitem__(self, col):
+        column = self.frame[col]
+        return column if self._everything else column.take(self.rows)
+
+    def isin(self, col, values):
+        """Boolean mask over the view: rows whose ``col`` value is in ``values``."""
+        return self[col].isin(values).to_numpy()
+
+    def where(self, mask):
+        """The view narrowed to the rows where ``mask`` (aligned with the view) is true."""
+        return RowView(self.frame, self.rows[np.asarray(mask, dtype=bool)])
+
+    def project(self, columns=None):
+        """A frame of the view's rows and ``columns`` (default: all), taken in one step.
+
+        Categories that no longer occur are dropped. Without any filtering the
+        projection shares its data with ``frame`` until it is written to.
+        """
+        frame = self.frame if columns is None else self.frame[list(columns)]
+        return compact_categories(frame if self._everything else frame.take(self.rows))
+
+
+class FacetCounter:
+    """Facet counts for one session, recomputed only where the inputs changed.
+
+    A column's counts depend on the selections of every other column and on
+    ``extra_key`` (whatever identifies the extra mask, e.g. slider bounds).
+    Changing one filter therefore refreshes every facet except its own, and
+    reruns that change nothing (tab clicks, chart widgets) refresh none.
+    Keep one instance per session, e.g. in ``st.session_state``.
+    """
+
+    def __init__(self):
+        self._index = None
+        self._memo = {}
+
+    @span("facet counts")
+    def counts(self, index, selections, extra=None, extra_key=None):
+        if index is not self._index:
+            # New data version: every facet is stale
+            self._index, self._memo = index, {}
+        keys = {col: index.selection_key(col, selected)
+                for col, selected in selections.items() if col in index.columns}
+        stale = {}
+        for col in index.columns:
+            signature = (tuple((other, key) for other, key in keys.items() if other != col), extra_key)
+            if col not in self._memo or self._memo[col][0] != signature:
+                stale[col] = signature
+        if stale:
+            fresh = index.facet_counts(selections, list(stale), extra)
+            for col, signature in stale.items():
+                self._memo[col] = (signature, fresh[col])
+        return {col: self._memo[col][1] for col in index.columns}
+
+
+def filter_index(name, columns):
+    """Return the ``FilterIndex`` of dataset ``name`` for its current version."""
+    columns = tuple(columns)
+    return derive(name, ("filter_index", columns), lambda frame: FilterIndex(frame, columns))
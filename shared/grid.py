@@ -0,0 +1,92 @@
+"""Server-side paginated table for the raw data tabs.
+
+``st.dataframe(df)`` serialises the whole filtered frame into the page, which
+stalls the browser and the websocket once a table reaches tens of thousands
+of rows. ``paged_grid`` keeps the frame on the server: search and sorting run
+there on row positions, and only the rows of the visible page are sent.
+
+The row order of the current search and sort is kept per session, so paging
+through a result does not repeat the search or sort.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from shared.loader import state_hash
+from shared.profiling import span
+
+PAGE_SIZES = (25, 50, 100, 250)
+ALL_COLUMNS = "All columns"
+
+
+def _matches(series, query):
+    """Boolean array: which values of ``series`` contain ``query`` (case-insensitive)."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Match each category once instead of every row
+        hits = series.cat.categories.astype(str).str.contains(query, case=False, regex=False)
+        codes = series.cat.codes.to_numpy()
+        return np.append(np.asarray(hits, dtype=bool), False)[codes]
+    text = series.astype("string").str.contains(query, case=False, regex=False)
+    return text.fillna(False).to_numpy(dtype=bool)
+
+
+def row_order(df, query="", search_column=ALL_COLUMNS, sort_column=None, ascending=True):
+    """Positions of the rows of ``df`` matching ``query``, in display order."""
+    rows = np.arange(len(df))
+    if query:
+        columns = df.columns if search_column == ALL_COLUMNS else [search_column]
+        hit = np.zeros(len(df), dtype=bool)
+        for col in columns:
+            hit |= _matches(df[col], query)
+        rows = rows[hit]
+    if sort_column is not None:
+        values = df[sort_column].iloc[rows].reset_index(drop=True)
+        order = values.sort_values(ascending=ascending, kind="stable", na_position="last").index
+        rows = rows[order.to_numpy()]
+    return rows
+
+
+def paged_grid(df, key, state=None, page_size=50):
+    """Show ``df`` one page at a time with server-side search and sorting.
+
+    ``state`` identifies the data behind ``df`` (dataset version and filter
+    selections) so the row order can be reused across reruns; without it
+    the order is recomputed on every rerun. ``page_size`` is the initial
+    choice among ``PAGE_SIZES``.
+    """
+    columns = list(df.columns)
+    search, search_in, sort_by, direction, size = st.columns([3, 2, 2, 1, 1])
+    query = search.text_input("Search", key=f"{key}_search", placeholder="Search rows…")
+    search_column = search_in.selectbox("In", [ALL_COLUMNS, *columns], key=f"{key}_search_in")
+    sort_column = sort_by.selectbox("Sort by", [None, *columns], key=f"{key}_sort",
+                                    format_func=lambda col: "—" if col is None else col)
+    ascending = direction.selectbox("Order", ["Asc", "Desc"], key=f"{key}_direction") == "Asc"
+    page_size = size.selectbox("Rows", PAGE_SIZES, index=PAGE_SIZES.index(page_size), key=f"{key}_size")
+
+    signature = (state_hash(state), query, search_column, sort_column, ascending)
+    memo = st.session_state.get(f"{key}_order")
+    if state is not None and memo is not None and memo[0] == signature:
+        rows = memo[1]
+    else:
+        with span(f"row order {key}"):
+            rows = row_order(df, query, search_column, sort_column, ascending)
+        st.session_state[f"{key}_order"] = (signature, rows)
+
+    pages = max(1, math.ceil(len(rows) / page_size))
+    page_key = f"{key}_page"
+    # A narrower search or filter can leave the stored page past the end
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    page = st.number_input("Page", min_value=1, max_value=pages, step=1, key=page_key)
+    start = (page - 1) * page_size
+    visible = rows[start:start + page_size]
+
+    with span(f"page {key}"):
+        st.dataframe(df.take(visible), width="stretch", hide_index=True)
+    if len(rows):
+        st.caption(f"Rows {start + 1:,}–{start + len(visible):,} of {len(rows):,} "
+                   f"(page {page} of {pages})")
+    else:
+        st.caption("No matching rows")
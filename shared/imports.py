@@ -0,0 +1,100 @@
+"""Deferred imports of heavy libraries, and a report of each app's import cost.
+
+Nothing reaches the browser until a script's module-level imports finish,
+and matplotlib, seaborn, wordcloud or openpyxl add up to a second to a cold
+worker's first paint. ``lazy_module`` returns a stand-in that imports the
+real module on first attribute access, so a library costs nothing until the
+section that uses it runs::
+
+    plt = lazy_module("matplotlib.pyplot")
+
+Usage (from the repository root)::
+
+    python -m shared.imports                          # every app
+    python -m shared.imports "HR Dashboard/OIntern.py" --top 15
+
+Each app's module-level imports run in a fresh interpreter under
+``python -X importtime``; the report lists the total and the most expensive
+top-level imports (best of ``--repeat`` runs).
+"""
+import argparse
+import ast
+import importlib
+import subprocess
+import sys
+import threading
+
+from shared.datasets import ROOT
+
+
+class _LazyModule:
+    def __init__(self, name):
+        self.__name = name
+        self.__module = None
+        self.__lock = threading.Lock()
+
+    def __load(self):
+        if self.__module is None:
+            with self.__lock:
+                if self.__module is None:
+                    self.__module = importlib.import_module(self.__name)
+        return self.__module
+
+    def __getattr__(self, attr):
+        return getattr(self.__load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self.__module is not None else "not loaded"
+        return f"<lazy module {self.__name!r} ({state})>"
+
+
+def lazy_module(name):
+    """Return module ``name`` if already imported, else a stand-in that imports it on first use."""
+    return sys.modules.get(name) or _LazyModule(name)
+
+
+# --- Import cost report ---
+
+def module_imports(path):
+    """Source of the import statements at module level of the script ``path``."""
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def import_times(statements):
+    """Run ``statements`` in a fresh interpreter; return ``[(module, depth, self_us, cumulative_us)]``."""
+    code = "\n".join([f"import sys; sys.path.insert(0, {str(ROOT)!r})", *statements])
+    done = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                          capture_output=True, text=True, check=True)
+    times = []
+    for line in done.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        times.append((name.strip(), depth, int(own), int(cumulative)))
+    return times
+
+
+def main(argv=None):
+    from shared.bench import APPS
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("apps", nargs="*", default=APPS, help="app scripts relative to the repository")
+    parser.add_argument("--top", type=int, default=8, help="top-level imports to list per app")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per app; the fastest is reported")
+    args = parser.parse_args(argv)
+
+    for app in args.apps:
+        statements = module_imports(ROOT / app)
+        runs = [import_times(statements) for _ in range(args.repeat)]
+        times = min(runs, key=lambda run: sum(own for _, _, own, _ in run))
+        total = sum(own for _, _, own, _ in times) / 1000
+        print(f"{app}: {total:,.0f} ms")
+        top = sorted((t for t in times if t[1] == 0), key=lambda t: -t[3])[:args.top]
+        for name, _, _, cumulative in top:
+            print(f"    {cumulative / 1000:8,.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
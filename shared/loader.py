@@ -0,0 +1,280 @@
+"""Process-wide workbook cache.
+
+Streamlit re-executes the whole script on every widget interaction, so a
+top-level ``pd.read_excel`` re-parses the workbook through openpyxl on every
+click, for every session. ``load_dataset`` parses each registered dashboard
+dataset once per process and hands out the same data until the file on disk
+changes. It prefers the Arrow snapshot written by ``python -m shared.snapshot``
+whenever that is newer than the workbook. Snapshots are memory-mapped, so loading one is
+close to free and its pages are shared by every worker process on the host.
+
+Inside a Streamlit server a background thread watches the files of the
+datasets in use. When one changes, the watcher waits for the file to settle,
+parses and validates it off the request path, and swaps the new version in
+atomically; a file that fails to parse (e.g. half-written) is ignored until it
+changes again. Each script run pins the versions it first sees, and the cache
+keeps the previous version next to the current one, so a session finishes its
+run on consistent data and picks up the new version on its next rerun.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from shared.datasets import DATASETS
+from shared.excel import read_dataset
+from shared.profiling import span
+
+try:
+    from pyarrow import feather
+except ImportError:  # snapshots are optional; fall back to the workbook
+    feather = None
+
+# Frames handed out by the cache are shallow copies of one shared parse. With
+# Copy-on-Write (always on from pandas 3) any write a dashboard makes lands on
+# its own copy and never leaks into the cached frame or other sessions.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+# Seconds between checks for changed dataset files; 0 turns the watcher off
+WATCH_INTERVAL = float(os.environ.get("DASHBOARD_WATCH_INTERVAL", 2))
+# Versions kept per cache entry: the current one and the one before it
+BUFFERS = 2
+
+_log = logging.getLogger(__name__)
+_lock = threading.Lock()
+_entries = {}
+# (version, frame) currently served per dataset, swapped by the watcher
+_current = {}
+_watcher = None
+_PINS_KEY = "_dataset_pins"
+
+
+class _Entry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buffers = OrderedDict()
+
+
+def file_version(path):
+    """Return the ``(mtime_ns, size)`` pair used to detect a changed file."""
+    stat = Path(path).stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _cached(key, version, build):
+    with _lock:
+        entry = _entries.setdefault(key, _Entry())
+    with entry.lock:
+        if version not in entry.buffers:
+            entry.buffers[version] = build()
+            while len(entry.buffers) > BUFFERS:
+                entry.buffers.popitem(last=False)
+        return entry.buffers[version]
+
+
+def read_source(dataset):
+    """Parse ``dataset`` straight from its workbook, bypassing every cache.
+
+    The sheet is streamed in chunks (see ``shared.excel``), so memory stays
+    bounded however large the workbook grows.
+    """
+    with span(f"read workbook {dataset.name}"):
+        return read_dataset(dataset)
+
+
+def read_snapshot(path):
+    """Load an Arrow snapshot through a memory map."""
+    return feather.read_table(path, memory_map=True).to_pandas()
+
+
+def fresh_snapshot(dataset):
+    """Return the snapshot path if it exists and is newer than the workbook.
+
+    A snapshot without a workbook (generated data) is always fresh.
+    """
+    if feather is None or not dataset.snapshot.exists():
+        return None
+    if (dataset.source.exists()
+            and dataset.snapshot.stat().st_mtime_ns < dataset.source.stat().st_mtime_ns):
+        return None
+    return dataset.snapshot
+
+
+def _source(name):
+    """Return ``(version, build)`` of the file currently backing dataset ``name``."""
+    dataset = DATASETS[name]
+    snapshot = fresh_snapshot(dataset)
+    if snapshot is not None:
+        # Re-applying the schema and metrics is a no-op for current snapshots
+        # and keeps ones compiled under an older registry entry correct
+        version = ("arrow", file_version(snapshot))
+        build = span(f"read snapshot {name}")(lambda: dataset.finish(read_snapshot(snapshot)))
+    else:
+        version = ("xlsx", file_version(dataset.source))
+        build = lambda: read_source(dataset)
+    return version, build
+
+
+def _run_pins():
+    """``{name: (version, frame)}`` seen by the running script, or None outside one."""
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return None
+    # Streamlit gives every run (and fragment rerun) a new cursors dict
+    pins = st.session_state.get(_PINS_KEY)
+    if pins is None or pins[0] is not ctx.cursors:
+        pins = (ctx.cursors, {})
+        st.session_state[_PINS_KEY] = pins
+    return pins[1]
+
+
+def _load(name):
+    """Return ``(version, frame)`` for ``name``; the frame is the shared original."""
+    pins = _run_pins()
+    if pins is None:
+        version, build = _source(name)
+        return version, _cached(("dataset", name), version, build)
+    if name not in pins:
+        _start_watcher()
+        # With the watcher running, serve its version without touching the file
+        loaded = _current.get(name) if _watcher is not None else None
+        if loaded is None:
+            version, build = _source(name)
+            loaded = version, _cached(("dataset", name), version, build)
+            if _watcher is not None:
+                _current.setdefault(name, loaded)
+        pins[name] = loaded
+    return pins[name]
+
+
+def load_dataset(name):
+    """Return the prepared frame of the registered dataset ``name``."""
+    return _load(name)[1].copy(deep=False)
+
+
+def dataset_version(name):
+    """Return a value identifying the data ``load_dataset(name)`` currently returns."""
+    return _load(name)[0]
+
+
+def derive(name, tag, build):
+    """Return ``build(frame)`` for dataset ``name``, computed once per data version.
+
+    ``tag`` tells apart the different structures derived from one dataset.
+    ``build`` receives the shared cached frame and must not modify it; its
+    result is shared by every session until the dataset changes.
+    """
+    version, frame = _load(name)
+    label = tag if isinstance(tag, str) else tag[0]
+    return _cached(("derived", name, tag), version, span(f"derive {name} {label}")(lambda: build(frame)))
+
+
+def state_hash(state):
+    """Stable digest of the values that determine a filtered frame."""
+    return hashlib.sha256(repr(state).encode()).hexdigest()
+
+
+class LRUCache:
+    """Thread-safe store keeping the ``size`` most recently used results."""
+
+    def __init__(self, size):
+        self.size = size
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+
+    def get(self, key, build):
+        """Return the value stored under ``key``, calling ``build()`` on a miss."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return self._data[key]
+        value = build()
+        with self._lock:
+            self._data[key] = value
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+        return value
+
+    def discard(self, key, value):
+        """Forget ``key`` if it still holds ``value`` (and not a newer result)."""
+        with self._lock:
+            if self._data.get(key) is value:
+                del self._data[key]
+
+
+def clear_cache():
+    """Drop every cached workbook."""
+    with _lock:
+        _entries.clear()
+        _current.clear()
+
+
+# --- Background watcher ---
+
+def _validate(name, frame, served):
+    """Raise ValueError unless ``frame`` can replace the ``served`` frame of ``name``."""
+    if frame.empty:
+        raise ValueError("no rows")
+    missing = set(served.columns) - set(frame.columns)
+    if missing:
+        raise ValueError(f"missing columns {', '.join(map(str, sorted(missing)))}")
+
+
+def _refresh(name, seen, rejected):
+    """Swap in a changed version of ``name`` once its file has settled."""
+    served_version, served = _current[name]
+    try:
+        version, build = _source(name)
+    except OSError:  # the file is being replaced
+        return
+    if version == served_version or version == rejected.get(name):
+        return
+    if seen.get(name) != version:
+        # Changed since the last check: wait until it stops changing
+        seen[name] = version
+        return
+    try:
+        frame = build()
+        _validate(name, frame, served)
+    except Exception as exc:
+        rejected[name] = version
+        _log.warning("Keeping %s %s: the new file was rejected (%s)", name, served_version, exc)
+        return
+    with _lock:
+        entry = _entries.setdefault(("dataset", name), _Entry())
+    with entry.lock:
+        entry.buffers[version] = frame
+        while len(entry.buffers) > BUFFERS:
+            entry.buffers.popitem(last=False)
+    _current[name] = (version, frame)
+    _log.info("Loaded %s %s", name, version)
+
+
+def _watch():
+    seen, rejected = {}, {}
+    while True:
+        time.sleep(WATCH_INTERVAL)
+        for name in list(_current):
+            try:
+                _refresh(name, seen, rejected)
+            except Exception:
+                _log.exception("Watching %s failed", name)
+
+
+def _start_watcher():
+    """Start the watcher thread once per process."""
+    global _watcher
+    if _watcher is not None or WATCH_INTERVAL <= 0:
+        return
+    with _lock:
+        if _watcher is None:
+            _watcher = threading.Thread(target=_watch, name="dataset-watcher", daemon=True)
+            _watcher.start()
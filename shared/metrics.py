@@ -0,0 +1,78 @@
+"""Declarative derived columns computed once at ingest.
+
+Some dashboards derived columns on every rerun, row by row (``.apply`` over
+a Python function) and with unguarded divisions. A dataset now lists its
+derived metrics next to its schema; the loader computes them with NumPy
+once per data version, so the cached frame already holds the results.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+def _values(df, column):
+    return df[column].to_numpy(dtype=float, na_value=np.nan)
+
+
+@dataclass(frozen=True)
+class Ratio:
+    """``name = numerator / denominator * scale``, NaN where the denominator is 0.
+
+    ``numerator`` is a column, or a ``(minuend, subtrahend)`` pair of columns
+    whose difference is divided.
+    """
+    name: str
+    numerator: object
+    denominator: str
+    scale: float = 1.0
+    decimals: int = None
+
+    def inputs(self):
+        numerator = self.numerator if isinstance(self.numerator, tuple) else (self.numerator,)
+        return (*numerator, self.denominator)
+
+    def compute(self, df):
+        if isinstance(self.numerator, tuple):
+            minuend, subtrahend = self.numerator
+            numerator = _values(df, minuend) - _values(df, subtrahend)
+        else:
+            numerator = _values(df, self.numerator)
+        denominator = _values(df, self.denominator)
+        ratio = np.full(len(df), np.nan)
+        np.divide(numerator, denominator, out=ratio, where=denominator != 0)
+        ratio *= self.scale
+        if self.decimals is not None:
+            ratio = ratio.round(self.decimals)
+        return ratio
+
+
+@dataclass(frozen=True)
+class Bands:
+    """Label ``source`` by the half-open bands between ``edges``.
+
+    ``labels`` has one more entry than ``edges``; a value equal to an edge
+    falls in the band above it. Missing values get no label.
+    """
+    name: str
+    source: str
+    edges: tuple
+    labels: tuple
+
+    def inputs(self):
+        return (self.source,)
+
+    def compute(self, df):
+        values = _values(df, self.source)
+        codes = np.digitize(values, self.edges)
+        codes[np.isnan(values)] = -1
+        return pd.Categorical.from_codes(codes, categories=list(self.labels))
+
+
+def apply_metrics(df, metrics):
+    """Add the ``metrics`` columns to ``df``; metrics with missing inputs are skipped."""
+    df = df.copy(deep=False)
+    for metric in metrics:
+        if all(col in df.columns for col in metric.inputs()):
+            df[metric.name] = metric.compute(df)
+    return df
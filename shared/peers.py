@@ -0,0 +1,52 @@
+"""Peer distributions for comparing one row against its group.
+
+The HR dashboard's intern explorer used to re-filter the whole frame by the
+intern's Specialisation or Sector and redraw a seaborn box plot every time a
+different intern was picked. ``PeerTable`` computes once per data version the
+box-plot statistics (quartiles, whiskers, outliers) of every peer group and
+every row's percentile rank within its groups, so picking an intern is a
+dictionary lookup and the chart is drawn from the summary with ``Axes.bxp``.
+"""
+import numpy as np
+import pandas as pd
+
+from shared.loader import derive
+
+
+class PeerTable:
+    def __init__(self, frame, value, groups):
+        """``groups`` maps a peer group name to its column, or None for all rows."""
+        from matplotlib.cbook import boxplot_stats
+
+        self.value = value
+        self.groups = dict(groups)
+        self._keys = {}
+        self._stats = {}
+        self._ranks = {}
+        values = frame[value]
+        for name, col in self.groups.items():
+            keys = pd.Series("all", index=frame.index) if col is None else frame[col]
+            grouped = values.groupby(keys, observed=True)
+            self._keys[name] = keys
+            # Same whisker rule (1.5 IQR) and quantiles as seaborn's box plot
+            self._stats[name] = {
+                key: boxplot_stats(group.dropna().to_numpy())[0]
+                for key, group in grouped if group.notna().any()
+            }
+            self._ranks[name] = grouped.rank(pct=True) * 100
+
+    def lookup(self, group, label):
+        """Return ``(box-plot stats, percentile rank)`` of row ``label`` among ``group``.
+
+        Either is None when the row has no group value or no score.
+        """
+        key = self._keys[group].at[label]
+        stats = None if pd.isna(key) else self._stats[group].get(key)
+        rank = self._ranks[group].at[label]
+        return stats, None if np.isnan(rank) else float(rank)
+
+
+def peer_table(name, value, groups):
+    """Return the ``PeerTable`` of dataset ``name`` for its current version."""
+    groups = tuple(dict(groups).items())
+    return derive(name, ("peer_table", value, groups), lambda frame: PeerTable(frame, value, groups))
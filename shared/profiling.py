@@ -0,0 +1,220 @@
+"""Per-section timings of a script run, shown in an opt-in sidebar panel.
+
+A slow rerun used to be a black box: the time could be spent reading the
+workbook, filtering, grouping or serialising Plotly figures. ``span`` times a
+section, as a context manager or a decorator, and the shared helpers already
+wrap the expensive steps in spans (workbook and snapshot reads, derived
+structures, filtering, each tab body, matplotlib renders, grids, exports and
+every ``plotly_chart`` call). When the sidebar's "Performance" toggle is on,
+``performance_panel`` lists the nested timings of the run and offers them as
+JSON or as a flame profile for https://www.speedscope.app.
+
+Tracing is off by default; a span then only looks up the session's trace.
+A fragment rerunning on its own is timed in a trace of its own, which the
+panel shows next to the last full run.
+
+Usage::
+
+    st.set_page_config(...)
+    start_profiling()
+
+    with span("pipeline stages"):
+        ...
+
+    performance_panel()  # last line of the script
+"""
+import functools
+import json
+import time
+from contextlib import ContextDecorator
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+from streamlit.delta_generator import DeltaGenerator
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+PANEL_KEY = "performance"
+_TRACE_KEY = "_performance_trace"
+_FRAGMENT_TRACE_KEY = "_performance_fragment_trace"
+
+
+class Trace:
+    """Nested spans of one script run, in the order they were opened."""
+
+    def __init__(self, name, run=None):
+        self.name = name
+        # The run context's cursors dict, which Streamlit renews on every (fragment) rerun
+        self.run = run
+        self.start = time.perf_counter()
+        self.end = None
+        # [name, depth, start, end] per span
+        self.spans = []
+        self._open = []
+
+    def enter(self, name):
+        self._open.append(len(self.spans))
+        self.spans.append([name, len(self._open) - 1, time.perf_counter(), None])
+
+    def exit(self):
+        self.spans[self._open.pop()][3] = time.perf_counter()
+
+    @property
+    def idle(self):
+        """True when no span is open."""
+        return not self._open
+
+    def finish(self):
+        self.end = time.perf_counter()
+
+    @property
+    def total_ms(self):
+        return self._ms(self.end)
+
+    def _ms(self, moment):
+        return (moment - self.start) * 1000
+
+    def rows(self):
+        """One record per span: name, depth, start, total and self time in ms."""
+        rows = []
+        parents = []
+        for name, depth, start, end in self.spans:
+            end = self.end if end is None else end
+            del parents[depth:]
+            row = {"name": name, "depth": depth, "start_ms": self._ms(start),
+                   "total_ms": (end - start) * 1000, "self_ms": (end - start) * 1000}
+            if parents:
+                parents[-1]["self_ms"] -= row["total_ms"]
+            parents.append(row)
+            rows.append(row)
+        return rows
+
+    def to_json(self):
+        return json.dumps({"name": self.name, "total_ms": self.total_ms, "spans": self.rows()}, indent=2)
+
+    def to_speedscope(self):
+        """The run as a speedscope evented profile (times in milliseconds)."""
+        frames = {}
+        events = []
+        open_spans = []
+
+        def close(depth):
+            while len(open_spans) > depth:
+                frame, end = open_spans.pop()
+                events.append({"type": "C", "frame": frame, "at": self._ms(end)})
+
+        for name, depth, start, end in self.spans:
+            close(depth)
+            frame = frames.setdefault(name, len(frames))
+            events.append({"type": "O", "frame": frame, "at": self._ms(start)})
+            open_spans.append((frame, self.end if end is None else end))
+        close(0)
+        return json.dumps({
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.name,
+            "shared": {"frames": [{"name": name} for name in frames]},
+            "profiles": [{
+                "type": "evented", "name": self.name, "unit": "milliseconds",
+                "startValue": 0, "endValue": self.total_ms, "events": events,
+            }],
+        })
+
+
+def current_trace():
+    """The trace of the running script, or None when profiling is off."""
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return None
+    trace = st.session_state.get(_TRACE_KEY)
+    if trace is None or not ctx.fragment_ids_this_run:
+        return trace
+    # Only a fragment is rerunning: time it apart from the run that already finished
+    fragment = st.session_state.get(_FRAGMENT_TRACE_KEY)
+    if fragment is None or fragment.run is not ctx.cursors:
+        fragment = Trace(f"{trace.name} (fragment)", run=ctx.cursors)
+        st.session_state[_FRAGMENT_TRACE_KEY] = fragment
+    return fragment
+
+
+class span(ContextDecorator):
+    """Time a section of the running script as ``name``.
+
+    Works as ``with span("name"):`` and as ``@span("name")``. Spans nest; one
+    opened while profiling is off (or outside a script thread) records nothing.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        trace = current_trace()
+        if trace is not None:
+            trace.enter(self.name)
+        return self
+
+    def __exit__(self, *exc):
+        # Looked up again: the instance is shared by every call of a decorated function
+        trace = current_trace()
+        if trace is not None:
+            trace.exit()
+            if trace.idle and trace is st.session_state.get(_FRAGMENT_TRACE_KEY):
+                # No end-of-script panel call finishes a fragment rerun
+                trace.finish()
+        return False
+
+
+def start_profiling(name=None):
+    """Start timing this run if the Performance toggle is on; call it first."""
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is not None and st.session_state.get(PANEL_KEY):
+        st.session_state[_TRACE_KEY] = Trace(name or Path(ctx.main_script_path).name)
+    else:
+        st.session_state.pop(_TRACE_KEY, None)
+        st.session_state.pop(_FRAGMENT_TRACE_KEY, None)
+
+
+def performance_panel():
+    """Draw the sidebar toggle and, when on, the timings of this run."""
+    st.sidebar.toggle("⏱️ Performance", key=PANEL_KEY, help="Time each section of this page")
+    trace = st.session_state.get(_TRACE_KEY)
+    if trace is None:
+        return
+    trace.finish()
+    sidebar = st.sidebar
+    sidebar.caption(f"Run took {trace.total_ms:,.0f} ms")
+    sidebar.dataframe(_table(trace), hide_index=True, width="stretch")
+    fragment = st.session_state.get(_FRAGMENT_TRACE_KEY)
+    if fragment is not None and fragment.end is not None:
+        with sidebar.expander(f"Last fragment rerun: {fragment.total_ms:,.0f} ms"):
+            st.dataframe(_table(fragment), hide_index=True, width="stretch")
+    json_col, speedscope_col = sidebar.columns(2)
+    json_col.download_button("JSON", trace.to_json(), file_name="profile.json",
+                             mime="application/json", key=f"{PANEL_KEY}_json")
+    speedscope_col.download_button("Speedscope", trace.to_speedscope(),
+                                   file_name="profile.speedscope.json",
+                                   mime="application/json", key=f"{PANEL_KEY}_speedscope")
+
+
+def _table(trace):
+    rows = pd.DataFrame(trace.rows(), columns=["name", "depth", "start_ms", "total_ms", "self_ms"])
+    return pd.DataFrame({
+        "Section": ["· " * depth + name for name, depth in zip(rows["name"], rows["depth"])],
+        "Total ms": rows["total_ms"].round(1),
+        "Self ms": rows["self_ms"].round(1),
+    })
+
+
+def _timed(method, name):
+    @functools.wraps(method)
+    def timed(*args, **kwargs):
+        with span(name):
+            return method(*args, **kwargs)
+    timed._profiled = True
+    return timed
+
+
+# Plotly figures are serialised inside plotly_chart; time every call, whether
+# made as st.plotly_chart or on a container (column, tab, expander)
+if not getattr(DeltaGenerator.plotly_chart, "_profiled", False):
+    DeltaGenerator.plotly_chart = _timed(DeltaGenerator.plotly_chart, "plotly_chart")
+    st.plotly_chart = _timed(st.plotly_chart, "plotly_chart")
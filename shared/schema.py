@@ -0,0 +1,63 @@
+"""Declarative column types for the dashboard datasets.
+
+The dashboards used to call ``pd.to_numeric``/``pd.to_datetime`` on every
+rerun and kept their filter columns as plain strings. A ``Schema`` declares
+those types once per dataset; the loader applies it at ingest, so the cached
+frame already holds numbers, timestamps and ``category`` filter columns.
+"""
+from dataclasses import dataclass
+
+import pandas as pd
+from pandas.api.types import infer_dtype
+
+
+@dataclass(frozen=True)
+class Schema:
+    numeric: tuple = ()
+    datetime: tuple = ()
+    categorical: tuple = ()
+
+    def apply(self, df):
+        """Coerce the declared columns of ``df``; missing columns are skipped.
+
+        Unparseable values become NaN/NaT, matching the ``errors="coerce"``
+        conversions the dashboards did by hand.
+        """
+        df = df.copy(deep=False)
+        for col in self.numeric:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors="coerce")
+        for col in self.datetime:
+            if col in df.columns:
+                df[col] = pd.to_datetime(df[col], errors="coerce")
+        for col in self.categorical:
+            if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype("category")
+        return df
+
+
+def compact_categories(df):
+    """Drop categories that no longer occur after filtering.
+
+    Categorical ``value_counts`` and plots list every category, including the
+    ones the sidebar filtered out, so filtered frames are compacted before
+    they reach the charts.
+    """
+    df = df.copy(deep=False)
+    for col in df.columns[df.dtypes == "category"]:
+        df[col] = df[col].cat.remove_unused_categories()
+    return df
+
+
+# Object column contents Arrow can store as a single typed column
+_ARROW_KINDS = {"string", "empty", "boolean", "integer", "floating", "mixed-integer-float",
+                "decimal", "datetime", "date"}
+
+
+def arrow_safe(df):
+    """Stringify object columns that mix types, which Arrow cannot store."""
+    df = df.copy()
+    for col in df.columns[df.dtypes == object]:
+        if infer_dtype(df[col], skipna=True) not in _ARROW_KINDS:
+            df[col] = df[col].map(str, na_action="ignore").astype("string")
+    return df
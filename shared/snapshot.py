@@ -0,0 +1,122 @@
+"""Compile dashboard workbooks into Arrow snapshots.
+
+Usage (from the repository root)::
+
+    python -m shared.snapshot                 # every registered workbook
+    python -m shared.snapshot buyside interns # just these datasets
+    python -m shared.snapshot --compression zstd
+    python -m shared.snapshot --jobs 4         # at most four worker processes
+
+Each snapshot is written next to its workbook as ``<name>.arrow`` (Arrow IPC /
+Feather v2) and is picked up by ``load_dataset`` while it is newer than the
+workbook. Snapshots are uncompressed by default so that loading them is a
+zero-copy memory map; compressed snapshots are smaller on disk but every
+process has to decompress its own copy.
+
+Parsing a workbook through openpyxl is CPU-bound and single-threaded, so the
+workbooks are compiled in a pool of worker processes: a cold deployment is
+ready in about the time of the slowest workbook instead of the sum of all.
+Progress is reported as each workbook finishes, followed by the totals.
+``refresh_snapshots`` does the same for the stale snapshots only and is run
+when the multipage app starts.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from pyarrow import feather
+
+from shared.datasets import DATA_ROOT, DATASETS
+from shared.loader import fresh_snapshot, read_source
+from shared.schema import arrow_safe
+
+
+def compile_snapshot(dataset, compression="uncompressed"):
+    """Write the snapshot of ``dataset`` and return the prepared frame."""
+    df = arrow_safe(read_source(dataset))
+    tmp = dataset.snapshot.with_name(dataset.snapshot.name + ".tmp")
+    feather.write_feather(df, tmp, compression=compression)
+    # Readers never see a half-written snapshot
+    os.replace(tmp, dataset.snapshot)
+    return df
+
+
+def _compile(name, compression):
+    start = time.perf_counter()
+    df = compile_snapshot(DATASETS[name], compression)
+    return len(df), len(df.columns), time.perf_counter() - start
+
+
+def compile_snapshots(names, compression="uncompressed", jobs=None):
+    """Compile the snapshots of ``names`` in worker processes.
+
+    Yields ``(name, rows, columns, seconds, error)`` as each one finishes;
+    ``error`` is None on success, otherwise the exception and the other
+    workbooks carry on.
+    """
+    names = list(names)
+    if not names:
+        return
+    jobs = min(jobs or os.cpu_count() or 1, len(names))
+    if jobs == 1:
+        # Nothing to overlap; skip starting a worker process
+        for name in names:
+            try:
+                yield (name, *_compile(name, compression), None)
+            except Exception as exc:
+                yield name, 0, 0, 0.0, exc
+        return
+    # Spawned workers are safe to start from a threaded server process
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=context) as pool:
+        futures = {pool.submit(_compile, name, compression): name for name in names}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                yield (name, *future.result(), None)
+            except Exception as exc:
+                yield name, 0, 0, 0.0, exc
+
+
+def refresh_snapshots(jobs=None):
+    """Compile, in parallel, every snapshot that is missing or older than its workbook."""
+    stale = [name for name, dataset in DATASETS.items()
+             if dataset.source.exists() and fresh_snapshot(dataset) is None]
+    return list(compile_snapshots(stale, jobs=jobs))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("datasets", nargs="*", help="datasets to compile (default: all)")
+    parser.add_argument("--compression", default="uncompressed",
+                        choices=["uncompressed", "lz4", "zstd"])
+    parser.add_argument("--jobs", type=int, help="worker processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+    unknown = set(args.datasets) - set(DATASETS)
+    if unknown:
+        parser.error(f"unknown dataset(s): {', '.join(sorted(unknown))}")
+
+    names = args.datasets or sorted(DATASETS)
+    start = time.perf_counter()
+    parsing, failed = 0.0, []
+    results = compile_snapshots(names, args.compression, args.jobs)
+    for done, (name, rows, cols, elapsed, error) in enumerate(results, 1):
+        progress = f"[{done}/{len(names)}] {name:<14}"
+        if error is not None:
+            failed.append(name)
+            print(f"{progress} failed: {error}", file=sys.stderr)
+            continue
+        parsing += elapsed
+        print(f"{progress} {rows:>8} rows {cols:>4} cols {elapsed:7.2f}s "
+              f"-> {DATASETS[name].snapshot.relative_to(DATA_ROOT)}")
+    print(f"{len(names) - len(failed)} snapshots in {time.perf_counter() - start:.2f}s "
+          f"({parsing:.2f}s of parsing)")
+    if failed:
+        sys.exit(f"failed: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
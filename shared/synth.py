@@ -0,0 +1,155 @@
+"""Generate synthetic dashboard data of any size from the bundled workbooks.
+
+Usage (from the repository root)::
+
+    python -m shared.synth out/ --rows 100000             # Arrow snapshots, every dataset
+    python -m shared.synth out/ --rows 5000 --format xlsx buyside interns
+    DASHBOARD_DATA_DIR=out streamlit run BuySide/BSapp.py
+
+Profiles are learnt from the workbooks checked into the repository, not from
+``$DASHBOARD_DATA_DIR``, so generating into the directory the dashboards are
+pointed at works; ``--source-dir`` learns from another copy of the data.
+
+The generator learns each workbook sheet column by column: numeric and date
+columns keep their empirical distribution (sampled through their quantiles,
+integers stay integers), low-cardinality columns keep their value set and
+frequencies, identifier-like text gets unique values in the same style, and
+every column keeps its share of blanks. Output mirrors the repository layout
+under the target directory, either as workbooks with the original sheet
+layout (sheet name, leading rows) or as the prepared Arrow snapshots the
+loader reads.
+"""
+import argparse
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from shared.datasets import DATASETS, ROOT
+from shared.export import write_xlsx
+from shared.schema import arrow_safe
+
+# Up to this many distinct values a column is sampled from its value set
+DISCRETE_LIMIT = 20
+# Text columns where most values are distinct are treated as identifiers
+IDENTIFIER_RATIO = 0.5
+
+
+@dataclass
+class ColumnProfile:
+    name: str
+    kind: str  # "quantiles", "datetime", "values" or "identifier"
+    missing: float
+    values: np.ndarray
+    weights: np.ndarray = None
+    integer: bool = False
+
+    def sample(self, rows, rng):
+        if self.kind in ("quantiles", "datetime"):
+            # Inverse-CDF sampling through the observed quantiles
+            points = np.linspace(0, 1, len(self.values))
+            column = np.interp(rng.random(rows), points, self.values)
+            if self.integer or self.kind == "datetime":
+                column = np.rint(column)
+            if self.kind == "datetime":
+                column = pd.to_datetime(column.astype(np.int64), unit="ns")
+        elif self.kind == "values":
+            column = rng.choice(self.values, size=rows, p=self.weights)
+        else:
+            stems = rng.choice(self.values, size=rows)
+            column = np.char.add(np.char.add(stems.astype(str), " "), np.arange(rows).astype(str))
+        column = pd.Series(column)
+        if self.missing:
+            column = column.mask(rng.random(rows) < self.missing)
+        return column
+
+
+def learn_column(name, series, categorical=False):
+    """Profile one raw column. ``categorical`` forces value-set sampling."""
+    present = series.dropna()
+    missing = 1 - len(present) / len(series) if len(series) else 0.0
+    if present.empty:
+        return ColumnProfile(name, "values", 1.0, np.array([None], dtype=object), np.array([1.0]))
+    counts = present.value_counts()
+    is_number = pd.api.types.is_numeric_dtype(present) and not pd.api.types.is_bool_dtype(present)
+    if pd.api.types.is_datetime64_any_dtype(present):
+        values = np.sort(present.to_numpy(dtype="datetime64[ns]").astype(np.int64)).astype(float)
+        return ColumnProfile(name, "datetime", missing, values)
+    if is_number and not categorical and len(counts) > DISCRETE_LIMIT:
+        values = np.sort(present.to_numpy(dtype=float))
+        return ColumnProfile(name, "quantiles", missing, values,
+                             integer=bool(np.all(values == np.round(values))))
+    if (not is_number and not categorical and len(counts) > DISCRETE_LIMIT
+            and len(counts) / len(present) > IDENTIFIER_RATIO):
+        return ColumnProfile(name, "identifier", missing, counts.index.to_numpy(dtype=object))
+    weights = counts.to_numpy(dtype=float)
+    return ColumnProfile(name, "values", missing, counts.index.to_numpy(dtype=object),
+                         weights / weights.sum())
+
+
+def read_raw(dataset, source_dir=ROOT):
+    """The workbook sheet of ``dataset`` under ``source_dir``, before ``Dataset.prepare``."""
+    return pd.read_excel(Path(source_dir) / dataset.path, **dataset.read_kwargs())
+
+
+def learn(dataset, source_dir=ROOT):
+    """Return the column profiles of ``dataset``'s workbook sheet under ``source_dir``."""
+    raw = read_raw(dataset, source_dir)
+    names = list(dataset.columns) if dataset.columns is not None else list(raw.columns.str.strip())
+    # Learn only from the rows the dashboards keep, so generated rows are not
+    # dropped as blank or incomplete; ``prepare`` renames the frame it gets
+    raw = raw.loc[dataset.prepare(raw.copy(deep=False)).index]
+    categorical = set(dataset.schema.categorical)
+    return [learn_column(header, raw[header], categorical=name in categorical)
+            for header, name in zip(raw.columns, names)]
+
+
+def synthesize(profiles, rows, seed=0):
+    """A raw sheet of ``rows`` rows drawn from ``profiles``."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({profile.name: profile.sample(rows, rng) for profile in profiles})
+
+
+def write_dataset(dataset, directory, rows, fmt="arrow", seed=0, source_dir=ROOT):
+    """Write a synthetic ``dataset`` learnt from ``source_dir`` under ``directory``; return its path."""
+    raw = synthesize(learn(dataset, source_dir), rows, seed)
+    target = Path(directory) / dataset.path
+    if fmt == "arrow":
+        target = target.with_suffix(".arrow")
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "xlsx":
+        sheet_name = dataset.sheet_name if isinstance(dataset.sheet_name, str) else "Sheet1"
+        with open(target, "wb") as out:
+            write_xlsx(raw, out, sheet_name=sheet_name, skiprows=dataset.skiprows or 0)
+    else:
+        from pyarrow import feather
+
+        feather.write_feather(arrow_safe(dataset.prepare(raw)), target)
+    return target
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory", help="output directory (use as $DASHBOARD_DATA_DIR)")
+    parser.add_argument("datasets", nargs="*", help="datasets to generate (default: all)")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--format", default="arrow", choices=["arrow", "xlsx"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--source-dir", type=Path, default=ROOT,
+                        help="directory holding the workbooks to learn from (default: the repository)")
+    args = parser.parse_intermixed_args(argv)
+    unknown = set(args.datasets) - set(DATASETS)
+    if unknown:
+        parser.error(f"unknown dataset(s): {', '.join(sorted(unknown))}")
+
+    for name in args.datasets or sorted(DATASETS):
+        start = time.perf_counter()
+        path = write_dataset(DATASETS[name], args.directory, args.rows, args.format, args.seed,
+                             args.source_dir)
+        print(f"{name:<14} {args.rows:>8} rows {time.perf_counter() - start:7.2f}s -> {path}")
+
+
+if __name__ == "__main__":
+    main()
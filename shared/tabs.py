@@ -0,0 +1,55 @@
+"""Lazy tabs: only the selected tab's body runs.
+
+``st.tabs`` normally executes every tab body on every rerun, so a filter
+change builds dozens of charts nobody sees. ``lazy_tabs`` creates tabs that
+track the selected tab, and ``tab_body`` runs a body only while its tab is
+open. Given a ``state`` (the data version and filter selections), the body's
+output is cached and replayed when the user comes back to the tab with
+nothing changed.
+
+Panels with widgets of their own (segment comparisons, drilldowns) cannot be
+replayed. They are ``st.fragment`` functions that take the already-filtered
+frame, so using their widgets reruns only that panel, not the dashboard.
+
+Usage::
+
+    tabs = lazy_tabs(["Overview", "Trends"], key="tabs")
+
+    @tab_body(tabs[0], state=view_state)
+    def overview():
+        st.plotly_chart(...)
+"""
+import streamlit as st
+
+from shared.profiling import span
+
+
+def lazy_tabs(labels, key):
+    """``st.tabs`` that reruns on tab switches and reports which tab is open."""
+    return st.tabs(labels, key=key, on_change="rerun")
+
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def _replay(_body, body_id, state):
+    # Streamlit records the elements drawn here and replays them on a hit
+    _body()
+
+
+def tab_body(tab, state=None):
+    """Decorator that runs the function as the body of ``tab`` when it is open.
+
+    ``state`` must capture everything the body's output depends on; pass it
+    only for bodies without widgets, since cached output cannot hold them.
+    """
+    def run(body):
+        # ``open`` is None when the tabs do not track state: run as st.tabs would
+        if tab.open is False:
+            return body
+        with tab, span(f"tab {body.__name__}"):
+            if state is None:
+                body()
+            else:
+                code = body.__code__
+                _replay(body, f"{code.co_filename}:{code.co_firstlineno}:{body.__qualname__}", state)
+        return body
+    return run
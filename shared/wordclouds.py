@@ -0,0 +1,87 @@
+"""Word clouds rendered in the background from precomputed word counts.
+
+``WordCloud(...).generate(text)`` re-tokenises the joined feedback of every
+filtered row and lays out the cloud on each rerun, which made it the slowest
+step of the HR dashboard. Here the text is tokenised once per data version
+into a table of (row, word) pairs. A filter then only counts the words of
+its rows, and the layout runs on a worker thread, cached by the resulting
+word frequencies, while the rest of the page is drawn.
+"""
+import functools
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+from shared.imports import lazy_module
+from shared.loader import LRUCache, state_hash
+
+MAX_ENTRIES = 32
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="wordcloud")
+_renders = LRUCache(MAX_ENTRIES)
+wordcloud = lazy_module("wordcloud")
+
+
+@functools.cache
+def _stopwords():
+    return frozenset(word.lower() for word in wordcloud.STOPWORDS)
+
+
+def token_table(texts):
+    """Words of ``texts``, one per entry, indexed by the row they came from.
+
+    Splits words as ``WordCloud.process_text`` does: runs of word characters
+    and apostrophes, trailing "'s" removed, numbers and stopwords dropped.
+    Unlike ``WordCloud.generate`` there are no collocations: bigrams are
+    scored over the whole joined text and cannot be counted per row, so the
+    cloud shows single words only.
+    """
+    words = texts.dropna().astype(str).str.findall(r"\w[\w']*").explode().dropna()
+    words = words.str.removesuffix("'s").str.removesuffix("'S")
+    return words[~words.str.lower().isin(_stopwords()) & ~words.str.isdigit()]
+
+
+def word_frequencies(tokens, rows):
+    """``{word: count}`` over the token rows whose label is in ``rows``.
+
+    As in ``WordCloud``, words are counted case-insensitively and shown in
+    their most common case, and a plural ("deals") is counted with its
+    singular when the singular occurs too.
+    """
+    counts = tokens[tokens.index.isin(rows)].value_counts()
+    if counts.empty:
+        return {}
+    words = counts.index
+    lower = words.str.lower()
+    plural = lower.str.endswith("s") & ~lower.str.endswith("ss") & lower.str[:-1].isin(lower)
+    words = words.where(~plural, words.str[:-1])
+    lower = lower.where(~plural, lower.str[:-1])
+    counts = counts.groupby([lower, words]).sum()
+    groups = counts.groupby(level=0)
+    return {case: total for (_, case), total in zip(groups.idxmax(), groups.sum())}
+
+
+def _render(frequencies, options):
+    cloud = wordcloud.WordCloud(**options).generate_from_frequencies(frequencies)
+    out = io.BytesIO()
+    cloud.to_image().save(out, format="PNG")
+    return out.getvalue()
+
+
+def _evict_failed(key, future):
+    # A failed render must not be replayed from the cache on every rerun
+    if future.cancelled() or future.exception() is not None:
+        _renders.discard(key, future)
+
+
+def render_wordcloud(frequencies, **options):
+    """Start rendering the cloud of ``frequencies``; returns a Future of PNG bytes.
+
+    Equal word counts share one render, including one still in progress; a
+    render that failed is dropped once it finishes, so the next rerun retries.
+    ``options`` are passed to ``WordCloud``.
+    """
+    key = state_hash((sorted(frequencies.items()), sorted(options.items())))
+    future = _renders.get(key, lambda: _executor.submit(_render, frequencies, options))
+    future.add_done_callback(lambda done: _evict_failed(key, done))
+    return future
+
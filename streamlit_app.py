@@ -0,0 +1,57 @@
+"""All Opulence dashboards as pages of one Streamlit app.
+
+    streamlit run streamlit_app.py
+
+Launching each folder's script with its own ``streamlit run`` starts one
+server per dashboard, and each process imports pandas, Plotly and matplotlib
+and holds its own copy of the data. Served as pages from here, the
+dashboards share one process: the libraries are imported once and the
+workbook, snapshot and derived-structure caches in ``shared.loader`` are
+filled once for every page and every session.
+
+The page scripts are unchanged and still run on their own as before.
+"""
+import threading
+
+import streamlit as st
+
+from shared.datasets import DATASETS
+from shared.loader import load_dataset
+from shared.snapshot import refresh_snapshots
+
+PAGES = {
+    "Deals": [
+        st.Page("InvestorDashboards/app2.py", title="Investors", icon="💼", url_path="investors", default=True),
+        st.Page("NewDeal/NDapp.py", title="New Deals", icon="🆕", url_path="new-deals"),
+        st.Page("ExsistingDeal/EDapp.py", title="Existing Deals", icon="📂", url_path="existing-deals"),
+        st.Page("FinModelling/FinMod.py", title="Financial Modelling", icon="📈", url_path="financial-modelling"),
+    ],
+    "Committees": [
+        st.Page("BuySide/BSapp.py", title="Buy Side", icon="🛒", url_path="buy-side"),
+        st.Page("SellSide/ssapp.py", title="Sell Side", icon="🏷️", url_path="sell-side"),
+        st.Page("PitchQuality/pitchapp.py", title="Pitch Quality", icon="🎯", url_path="pitch-quality"),
+    ],
+    "Operations": [
+        st.Page("VendorSide/vsapp.py", title="Vendors", icon="📦", url_path="vendors"),
+        st.Page("HR Dashboard/OIntern.py", title="Interns", icon="👩‍🎓", url_path="interns"),
+    ],
+}
+
+
+@st.cache_resource(show_spinner=False)
+def _warm_cache():
+    # Once per server, in the background: compile stale snapshots in parallel
+    # worker processes, then load every dataset, so the first visit to each
+    # page finds its data already parsed
+    def warm():
+        refresh_snapshots()
+        for name in DATASETS:
+            load_dataset(name)
+
+    thread = threading.Thread(target=warm, name="warm-datasets", daemon=True)
+    thread.start()
+    return thread
+
+
+_warm_cache()
+st.navigation(PAGES).run()